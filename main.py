@@ -20,11 +20,25 @@ from dotenv import load_dotenv
 import smtplib
 import imaplib
 import email
+import email.utils
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import calendar
 import pickle
-from googleapiclient.discovery import build
+import argparse
+from abc import abstractmethod
+import uuid
+import bisect
+import random
+import queue
+import select
+import math
+import array
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 
@@ -41,6 +55,25 @@ from langchain.chains import LLMChain
 from langchain.utilities import SerpAPIWrapper
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
+from collections import Counter
+
+# Optional: audio tag reader for the local music library
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+# Optional: C implementation of frame energy (removed from the stdlib in Python 3.13)
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+# Optional: llama.cpp bindings for the local CPU LLM backend
+try:
+    from llama_cpp import Llama, LlamaRAMCache
+except ImportError:
+    Llama = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -54,7 +87,362 @@ except LookupError:
     nltk.download('punkt', quiet=True)
     nltk.download('stopwords', quiet=True)
 
-class MistralLLM(LLM):
+# Shared HTTP connection pool for all API-backed tools
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session(pool_size=None):
+    """Return the process-wide requests session with pooled keep-alive connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            size = max(pool_size or 0, HTTP_POOL_SIZE)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+class SlotParser:
+    """Single-pass parser for dates, times, durations and places in an utterance.
+    
+    Every slot pattern is an alternative of one precompiled regex, so an
+    utterance is scanned once and each match is dispatched on its group name.
+    """
+    
+    NUMBER_WORDS = {
+        'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+        'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+        'fifteen': 15, 'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+        'sixty': 60, 'ninety': 90,
+    }
+    UNIT_SECONDS = {'h': 3600, 'm': 60, 's': 1}
+    WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+    TIME_OF_DAY = {'morning': 9, 'afternoon': 15, 'evening': 18, 'night': 20, 'tonight': 20}
+    
+    _COUNT = (r"\d+(?:\.\d+)?|(?:twenty|thirty|forty|fifty)(?:[\s-](?:one|two|three|four|five|six|seven|eight|nine))?|"
+              r"one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|fifteen|sixty|ninety")
+    _ARTICLE = r"half\s+an?|an?"
+    _NUM = rf"{_ARTICLE}|{_COUNT}"
+    _UNIT_WORD = r"hours?|hrs?|minutes?|mins?|seconds?|secs?"
+    _UNIT = rf"{_UNIT_WORD}|h|m|s"
+    _MER = r"a\.?m\.?|p\.?m\.?"
+    _WEEKDAY = r"monday|tues(?:day)?|wednesday|thurs(?:day)?|friday|saturday|sunday"
+    _MONTH = (r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+              r"sep(?:t|tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?")
+    # "a"/"an" only count before a spelled-out unit, so "i am" is never "1 minute"
+    _DUR_PART = rf"(?:(?:{_COUNT})\s*(?:{_UNIT})|(?:{_ARTICLE})\s+(?:{_UNIT_WORD}))\b(?:\s+and\s+a\s+half)?"
+    _STOP = (rf"today|tonight|tomorrow|now|right|next|this|on|at|by|from|to|until|with|and|in|for|"
+             rf"{_WEEKDAY}|{_MONTH}|morning|afternoon|evening|night")
+    
+    PATTERN = re.compile(rf"""
+        (?P<range>\b(?:from\s+|between\s+)?
+            (?P<r_hour1>\d{{1,2}})(?::(?P<r_min1>\d{{2}}))?\s*(?P<r_mer1>{_MER})?
+            \s*(?:-|to|until|till|and)\s*
+            (?P<r_hour2>\d{{1,2}})(?::(?P<r_min2>\d{{2}}))?\s*(?P<r_mer2>{_MER})(?![a-z]))
+      | (?P<reldays>\b(?:in\s+)?(?P<rd_num>{_NUM})\s+(?P<rd_unit>days?|weeks?)(?:\s+from\s+(?:now|today))?\b)
+      | (?P<duration>\b(?:(?:in|for)\s+)?{_DUR_PART}(?:\s*(?:,|and)?\s*{_DUR_PART})*)
+      | (?P<time>\b(?:at\s+|by\s+)?
+            (?:(?P<t_hour>\d{{1,2}})(?::(?P<t_min>\d{{2}}))?\s*(?P<t_mer>{_MER})(?![a-z])
+             | (?P<t_hh>\d{{1,2}}):(?P<t_mm>\d{{2}})
+             | (?P<t_word>noon|midday|midnight)
+             | (?P<t_oclock>\d{{1,2}})\s*o'?\s*clock))
+      | (?P<bare_time>\bat\s+(?P<b_hour>\d{{1,2}})\b(?!\s*(?:{_UNIT}|%|\.\d|days?|weeks?)\b))
+      | (?P<relday>\b(?:(?:for|on)\s+)?(?:the\s+)?(?P<rel>day\s+after\s+tomorrow|today|tonight|tomorrow|yesterday|next\s+week)\b
+            (?:\s+(?P<rel_tod>morning|afternoon|evening|night)\b)?)
+      | (?P<tod>\b(?:in\s+the\s+|this\s+|at\s+)(?P<tod_word>morning|afternoon|evening|night)\b)
+      | (?P<weekday>\b(?:(?P<w_mod>next|this|coming|on)\s+)?(?P<w_day>{_WEEKDAY})\b)
+      | (?P<iso>\b(?P<iso_y>\d{{4}})-(?P<iso_m>\d{{2}})-(?P<iso_d>\d{{2}}))
+      | (?P<monthday>\b(?P<md_month>{_MONTH})\.?\s+(?:the\s+)?(?P<md_day>\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s*(?P<md_year>\d{{4}}))?)
+      | (?P<daymonth>\b(?:the\s+)?(?P<dm_day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<dm_month>{_MONTH})\b(?:,?\s*(?P<dm_year>\d{{4}}))?)
+      | (?P<ordinal>\bthe\s+(?P<o_day>\d{{1,2}})(?:st|nd|rd|th)\b)
+      | (?P<place>\b(?:in|at|for)\s+
+            (?!(?:the|a|an|my|me|your|our|it|this|that|some|what|least|most|{_STOP})\b)
+            (?P<p_name>[a-z][a-z.'-]*(?:\s+(?!(?:{_STOP})\b)[a-z][a-z.'-]*)*))
+    """, re.VERBOSE)
+    DUR_PART_PATTERN = re.compile(rf"(?:(?P<num>{_COUNT})\s*(?P<unit>{_UNIT})|(?P<article>{_ARTICLE})\s+(?P<article_unit>{_UNIT_WORD}))"
+                                  rf"\b(?P<half>\s+and\s+a\s+half)?")
+    
+    def __init__(self, timezone='Asia/Kolkata'):
+        self.tz = pytz.timezone(timezone)
+    
+    def parse(self, text, now=None):
+        """Return the date, time, end_time, duration (seconds) and location found in text."""
+        now = now or datetime.now(self.tz)
+        slots = {'date': None, 'time': None, 'end_time': None, 'duration': None, 'location': None}
+        bare_hour = None
+        default_hour = None
+        
+        for match in self.PATTERN.finditer(text.lower()):
+            kind = match.lastgroup
+            if kind == 'range' and slots['time'] is None:
+                end = self._clock(match.group('r_hour2'), match.group('r_min2'), match.group('r_mer2'))
+                # "3 to 4 pm" shares the second meridiem unless that would end before it starts
+                mer1 = match.group('r_mer1') or match.group('r_mer2')
+                start = self._clock(match.group('r_hour1'), match.group('r_min1'), mer1)
+                if start and end and start > end and not match.group('r_mer1'):
+                    start = self._clock(match.group('r_hour1'), match.group('r_min1'), 'am')
+                if start and end:
+                    slots['time'], slots['end_time'] = start, end
+            elif kind == 'reldays' and slots['date'] is None:
+                days = self._number(match.group('rd_num'))
+                if match.group('rd_unit').startswith('week'):
+                    days *= 7
+                slots['date'] = (now + timedelta(days=days)).date()
+            elif kind == 'duration' and slots['duration'] is None:
+                slots['duration'] = self._duration(match.group('duration'))
+            elif kind == 'time' and slots['time'] is None:
+                slots['time'] = self._time(match)
+            elif kind == 'bare_time' and bare_hour is None:
+                bare_hour = int(match.group('b_hour'))
+            elif kind == 'relday' and slots['date'] is None:
+                rel = ' '.join(match.group('rel').split())
+                offset = {'today': 0, 'tonight': 0, 'tomorrow': 1, 'yesterday': -1,
+                          'day after tomorrow': 2, 'next week': 7}[rel]
+                slots['date'] = (now + timedelta(days=offset)).date()
+                if match.group('rel_tod') or rel == 'tonight':
+                    default_hour = self.TIME_OF_DAY[match.group('rel_tod') or rel]
+            elif kind == 'tod':
+                default_hour = self.TIME_OF_DAY[match.group('tod_word')]
+            elif kind == 'weekday' and slots['date'] is None:
+                slots['date'] = self._weekday(match.group('w_day'), match.group('w_mod'), now)
+            elif kind == 'iso' and slots['date'] is None:
+                slots['date'] = self._date(int(match.group('iso_y')), int(match.group('iso_m')),
+                                           int(match.group('iso_d')))
+            elif kind == 'monthday' and slots['date'] is None:
+                slots['date'] = self._month_date(match.group('md_month'), match.group('md_day'),
+                                                 match.group('md_year'), now)
+            elif kind == 'daymonth' and slots['date'] is None:
+                slots['date'] = self._month_date(match.group('dm_month'), match.group('dm_day'),
+                                                 match.group('dm_year'), now)
+            elif kind == 'ordinal' and slots['date'] is None:
+                slots['date'] = self._ordinal_date(int(match.group('o_day')), now)
+            elif kind == 'place' and slots['location'] is None:
+                slots['location'] = match.group('p_name').strip(" .'-")
+        
+        if slots['time'] is None and bare_hour is not None and 0 <= bare_hour <= 23:
+            slots['time'] = self._bare_time(bare_hour, default_hour)
+        elif slots['time'] is None and default_hour is not None:
+            slots['time'] = datetime.min.time().replace(hour=default_hour)
+        return slots
+    
+    def _number(self, text):
+        text = ' '.join(text.replace('-', ' ').split())
+        if text.startswith('half'):
+            return 0.5
+        if text[0].isdigit():
+            return float(text) if '.' in text else int(text)
+        return sum(self.NUMBER_WORDS[word] for word in text.split())
+    
+    def _duration(self, text):
+        total = 0
+        for part in self.DUR_PART_PATTERN.finditer(text):
+            unit = self.UNIT_SECONDS[(part.group('unit') or part.group('article_unit'))[0]]
+            amount = self._number(part.group('num') or part.group('article'))
+            if part.group('half'):
+                amount += 0.5
+            total += amount * unit
+        return int(round(total))
+    
+    def _clock(self, hour, minute, meridiem):
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            if not 1 <= hour <= 12:
+                return None
+            hour = hour % 12 + (12 if meridiem.startswith('p') else 0)
+        if hour > 23 or minute > 59:
+            return None
+        return datetime.min.time().replace(hour=hour, minute=minute)
+    
+    def _time(self, match):
+        if match.group('t_hour'):
+            return self._clock(match.group('t_hour'), match.group('t_min'), match.group('t_mer'))
+        if match.group('t_hh'):
+            return self._clock(match.group('t_hh'), match.group('t_mm'), None)
+        if match.group('t_word'):
+            hour = 0 if match.group('t_word') == 'midnight' else 12
+            return datetime.min.time().replace(hour=hour)
+        return self._bare_time(int(match.group('t_oclock')), None)
+    
+    def _bare_time(self, hour, default_hour):
+        """Resolve an hour without am/pm, e.g. "at 3", using business-hours defaults."""
+        if hour > 12:
+            return self._clock(hour, 0, None)
+        if default_hour is not None:
+            meridiem = 'pm' if default_hour >= 12 else 'am'
+        else:
+            meridiem = 'am' if 8 <= hour <= 11 else 'pm'
+        return self._clock(hour, 0, meridiem)
+    
+    def _weekday(self, day, modifier, now):
+        target = self.WEEKDAYS.index(day[:3])
+        ahead = (target - now.weekday()) % 7
+        if ahead == 0 and modifier != 'this':
+            ahead = 7
+        return (now + timedelta(days=ahead)).date()
+    
+    def _date(self, year, month, day):
+        try:
+            return datetime(year, month, day).date()
+        except ValueError:
+            return None
+    
+    def _month_date(self, month, day, year, now):
+        month = self.MONTHS.index(month[:3]) + 1
+        if year:
+            return self._date(int(year), month, int(day))
+        date = self._date(now.year, month, int(day))
+        if date and date < now.date():
+            date = self._date(now.year + 1, month, int(day))
+        return date
+    
+    def _ordinal_date(self, day, now):
+        date = self._date(now.year, now.month, day)
+        if date is None or date < now.date():
+            year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+            date = self._date(year, month, day)
+        return date
+
+# Shared parser instance used by the calendar, timer and weather call sites
+SLOT_PARSER = SlotParser()
+
+# Per-thread details about the turn being processed, read by the LLM layer
+TURN_CONTEXT = threading.local()
+
+class SpeechBudget:
+    """Token caps and early-stop rules for a reply that will be read aloud.
+    
+    Generation is streamed and cut at the sentence boundary where the spoken
+    part reaches the intent's sentence or duration limit. For agent turns only
+    the text after the "AI:" prefix counts as speech, so tool calls are never cut.
+    """
+    
+    # intent -> (max tokens, max sentences, max spoken seconds)
+    INTENT_LIMITS = {
+        'tool': (200, 2, 12.0),
+        'chat': (150, 3, 15.0),
+        'explain': (350, 5, 35.0),
+    }
+    WORDS_PER_SECOND = 3.0    # matches the 180 wpm TTS rate
+    SENTENCE_END = re.compile(r'(\S*?)([.!?])["\')\]]*\s')
+    # A period after these (or after an initial like "J.") doesn't end a sentence
+    ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc', 'inc', 'ltd',
+                     'co', 'no', 'approx', 'dept', 'est', 'fig', 'gen', 'gov', 'lt', 'col', 'sgt', 'capt'}
+    SPOKEN_MARKER = re.compile(r'(?:^|\n)AI:\s*')
+    
+    def __init__(self, intent='chat', require_marker=True):
+        self.intent = intent
+        self.max_tokens, self.max_sentences, self.max_seconds = self.INTENT_LIMITS[intent]
+        self.require_marker = require_marker
+        self.truncated = False
+        self.chunks = 0           # streamed chunks, roughly one token each
+        self.calls = 0
+        self.saved_seconds = 0.0
+    
+    @classmethod
+    def for_input(cls, user_input, require_marker=True):
+        """Pick a budget from what the user asked for."""
+        text = user_input.lower()
+        if any(phrase in text for phrase in ['explain', 'describe', 'tell me about', 'how does', 'how do', 'why', 'what is', 'what are']):
+            intent = 'explain'
+        elif any(word in text for word in ['schedule', 'meeting', 'calendar', 'email', 'mail', 'weather', 'play', 'timer', 'news']):
+            intent = 'tool'
+        else:
+            intent = 'chat'
+        return cls(intent, require_marker)
+    
+    def _cut_point(self, text):
+        """Return where to stop the reply, or None to keep generating."""
+        if self.require_marker:
+            markers = list(self.SPOKEN_MARKER.finditer(text))
+            if not markers:
+                return None
+            spoken_start = markers[-1].end()
+        else:
+            spoken_start = 0
+        
+        spoken = text[spoken_start:]
+        boundaries = self._sentence_ends(spoken)
+        if len(boundaries) >= self.max_sentences:
+            return spoken_start + boundaries[self.max_sentences - 1]
+        if len(spoken.split()) / self.WORDS_PER_SECOND >= self.max_seconds:
+            return spoken_start + (boundaries[-1] if boundaries else spoken.rfind(' '))
+        return None
+    
+    def _sentence_ends(self, text):
+        """Return the offsets just after each sentence end in text."""
+        ends = []
+        for match in self.SENTENCE_END.finditer(text):
+            word = match.group(1).lstrip('"\'([').lower()
+            if match.group(2) == '.' and (word in self.ABBREVIATIONS or '.' in word
+                                          or (len(word) == 1 and word.isalpha())):
+                continue
+            ends.append(match.end())
+        return ends
+    
+    def consume(self, chunks):
+        """Collect streamed chunks until the reply has said enough."""
+        text = ""
+        count = 0
+        start = time.perf_counter()
+        for chunk in chunks:
+            text += chunk
+            count += 1
+            cut = self._cut_point(text)
+            if cut is not None:
+                elapsed = time.perf_counter() - start
+                self.truncated = True
+                # Backends stream about one token per chunk
+                self.saved_seconds += max(0, self.max_tokens - count) * elapsed / count
+                text = text[:cut]
+                break
+        self.chunks += count
+        self.calls += 1
+        return text.strip()
+    
+    def summary(self):
+        """One-line report of what this turn generated."""
+        line = f"📊 LLM turn ({self.intent}): {self.chunks} streamed chunks in {self.calls} call{'s' if self.calls != 1 else ''}, cap {self.max_tokens} tokens/call"
+        if self.truncated:
+            line += f", stopped early - up to {self.saved_seconds:.1f}s of generation saved"
+        return line
+
+class LLMBackend(LLM):
+    """Base class for Jarvis LLM backends.
+    
+    Backends implement _complete(), which raises on failure so a router can
+    fall back to another backend, and may implement _stream() so replies can
+    be cut short under a SpeechBudget; _call() turns failures into error text.
+    """
+    
+    @abstractmethod
+    def _complete(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Return the completion for prompt, raising on failure."""
+    
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, max_tokens: Optional[int] = None):
+        yield self._complete(prompt, stop)
+    
+    def respond(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Complete prompt, streaming under the current turn's speech budget if it has one."""
+        budget = getattr(TURN_CONTEXT, 'speech_budget', None)
+        if budget is None:
+            return self._complete(prompt, stop)
+        chunks = self._stream(prompt, stop, budget.max_tokens)
+        try:
+            return budget.consume(chunks)
+        finally:
+            chunks.close()
+    
+    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        try:
+            return self.respond(prompt, stop)
+        except Exception as e:
+            return f"Error calling {self._llm_type} LLM: {str(e)}"
+
+class MistralLLM(LLMBackend):
     """Custom Mistral LLM wrapper for LangChain."""
     
     api_key: str
@@ -62,32 +450,68 @@ class MistralLLM(LLM):
     max_tokens: int = 500
     temperature: float = 0.3
     
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+    def _complete(self, prompt: str, stop: Optional[List[str]] = None) -> str:
         """Call the Mistral API."""
+        url = "https://api.mistral.ai/v1/chat/completions"
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+        
+        response = get_http_session().post(url, headers=headers, json=payload, timeout=15)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('choices'):
+                return data['choices'][0]['message']['content'].strip()
+        
+        raise RuntimeError("Unable to get response from Mistral API")
+    
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, max_tokens: Optional[int] = None):
+        """Stream the reply; closing the generator closes the connection and ends generation."""
+        url = "https://api.mistral.ai/v1/chat/completions"
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature,
+            "stream": True
+        }
+        
+        response = get_http_session().post(url, headers=headers, json=payload, timeout=15, stream=True)
         try:
-            url = "https://api.mistral.ai/v1/chat/completions"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model_name,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('choices'):
-                    return data['choices'][0]['message']['content'].strip()
-            
-            return "Error: Unable to get response from Mistral API"
-            
+            if response.status_code != 200:
+                raise RuntimeError(f"Mistral API returned status {response.status_code}")
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                content = choices[0].get('delta', {}).get('content')
+                if content:
+                    yield content
+        finally:
+            response.close()
+    
+    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        try:
+            return self.respond(prompt, stop)
         except Exception as e:
             return f"Error calling Mistral API: {str(e)}"
     
@@ -95,67 +519,844 @@ class MistralLLM(LLM):
     def _llm_type(self) -> str:
         return "mistral"
 
+# Loaded llama.cpp models, shared by every LocalLlamaLLM pointing at the same file
+_local_models = {}
+_local_models_lock = threading.Lock()
+
+class LocalLlamaLLM(LLMBackend):
+    """Local CPU LLM backend running a quantized GGUF model through llama.cpp.
+    
+    The model is loaded once per process with memory-mapped weights, and
+    calls are serialized on one warm context so the shared agent prompt
+    prefix stays in the KV cache between turns.
+    """
+    
+    model_path: str
+    n_ctx: int = 4096
+    n_threads: Optional[int] = None
+    max_tokens: int = 256
+    temperature: float = 0.3
+    
+    def load(self):
+        """Load the model (once) and return (model, lock)."""
+        if Llama is None:
+            raise RuntimeError("llama-cpp-python is not installed")
+        
+        with _local_models_lock:
+            if self.model_path not in _local_models:
+                model = Llama(
+                    model_path=self.model_path,
+                    n_ctx=self.n_ctx,
+                    n_threads=self.n_threads or os.cpu_count(),
+                    use_mmap=True,
+                    use_mlock=False,
+                    verbose=False
+                )
+                model.set_cache(LlamaRAMCache())
+                _local_models[self.model_path] = (model, threading.Lock())
+            return _local_models[self.model_path]
+    
+    def _complete(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Run a completion on the local model."""
+        model, lock = self.load()
+        with lock:
+            result = model.create_completion(
+                prompt,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                stop=stop or []
+            )
+        return result['choices'][0]['text'].strip()
+    
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, max_tokens: Optional[int] = None):
+        """Stream tokens from the local model; closing the generator stops decoding."""
+        model, lock = self.load()
+        with lock:
+            for chunk in model.create_completion(
+                prompt,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=self.temperature,
+                stop=stop or [],
+                stream=True
+            ):
+                text = chunk['choices'][0]['text']
+                if text:
+                    yield text
+    
+    @property
+    def _llm_type(self) -> str:
+        return "local-llama"
+
+class TieredLLM(LLM):
+    """Route each call to a primary, fallback or fast backend.
+    
+    Short user turns go to the fast backend when one is configured; if the
+    chosen backend fails, the fallback backend answers instead.
+    """
+    
+    primary: Any
+    fallback: Any = None
+    fast: Any = None
+    fast_max_words: int = 8
+    
+    def _backends(self):
+        user_input = getattr(TURN_CONTEXT, 'user_input', None)
+        first = self.primary
+        if self.fast and user_input and len(user_input.split()) <= self.fast_max_words:
+            first = self.fast
+        backends = [first]
+        for backend in (self.primary, self.fallback):
+            if backend and backend not in backends:
+                backends.append(backend)
+        return backends
+    
+    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        errors = []
+        for backend in self._backends():
+            try:
+                return backend.respond(prompt, stop)
+            except Exception as e:
+                errors.append(f"{backend._llm_type}: {str(e)}")
+        return "Error calling LLM backends: " + "; ".join(errors)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "tiered"
+
+class EventBus:
+    """In-process queue on which tools publish events for proactive announcements."""
+    
+    def __init__(self):
+        self.events = queue.Queue()
+    
+    def publish(self, kind, text, expires_in=None, **data):
+        """Publish an event; text is what Jarvis should say about it."""
+        expires = time.time() + expires_in if expires_in else None
+        self.events.put(dict(data, kind=kind, text=text, time=time.time(), expires=expires))
+    
+    def get(self, timeout=None):
+        """Return the next event, or None if none arrives within timeout."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def drain(self):
+        """Return every event already waiting."""
+        events = []
+        while True:
+            event = self.get(timeout=0)
+            if event is None:
+                return events
+            events.append(event)
+    
+    def handled(self, count=1):
+        """Mark count events as announced or dropped."""
+        for _ in range(count):
+            self.events.task_done()
+    
+    def wait_handled(self, timeout):
+        """Wait until every published event has been handled; returns False on timeout."""
+        with self.events.all_tasks_done:
+            return self.events.all_tasks_done.wait_for(lambda: not self.events.unfinished_tasks, timeout)
+
+class NotificationDispatcher:
+    """Single consumer of the event bus that decides when to announce events.
+    
+    Announcements wait until Jarvis is idle - waiting for the wake word or
+    between two turns of a conversation - batch whatever piled up meanwhile
+    into one message, and drop events that have expired. The message is
+    spoken by the main loop, which owns the TTS engine.
+    """
+    
+    RETRY_DELAY = 0.5
+    
+    def __init__(self, jarvis, event_bus):
+        self.jarvis = jarvis
+        self.event_bus = event_bus
+    
+    def start(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+    
+    def _run(self):
+        while True:
+            event = self.event_bus.get()
+            if event is None:
+                continue
+            pending = [event]
+            while pending:
+                self.jarvis.idle.wait()
+                pending.extend(self.event_bus.drain())
+                now = time.time()
+                live = [e for e in pending if not e['expires'] or e['expires'] > now]
+                self.event_bus.handled(len(pending) - len(live))
+                pending = live
+                if not pending:
+                    break
+                try:
+                    spoken = self.jarvis.announce(" ".join(e['text'] for e in pending))
+                except Exception as e:
+                    print(f"Notification error: {e}")
+                    spoken = True
+                if spoken:
+                    self.event_bus.handled(len(pending))
+                    pending = []
+                    continue
+                time.sleep(self.RETRY_DELAY)
+
+class MailWatcher:
+    """Persistent IMAP IDLE connection that publishes new mail to the event bus."""
+    
+    IDLE_TIMEOUT = 25 * 60    # servers drop IDLE after 30 minutes
+    POLL_INTERVAL = 1.0
+    RESPONSE_TIMEOUT = 30
+    MAX_RETRY_DELAY = 300
+    
+    def __init__(self, email_config, event_bus):
+        self.email_user = email_config.get('user')
+        self.email_password = email_config.get('password')
+        self.email_imap_server = email_config.get('imap_server', 'imap.gmail.com')
+        self.event_bus = event_bus
+        self.stop_event = threading.Event()
+        self.known = None         # message count last seen, kept across reconnects
+        self.retry_delay = 5
+    
+    def start(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+    
+    def close(self):
+        self.stop_event.set()
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self._watch()
+            except Exception as e:
+                print(f"⚠️  Mail watcher disconnected ({e}), reconnecting in {self.retry_delay}s")
+                self.stop_event.wait(self.retry_delay)
+                self.retry_delay = min(self.retry_delay * 2, self.MAX_RETRY_DELAY)
+    
+    def _watch(self):
+        """Log in once and IDLE on the same connection until it drops."""
+        mail = imaplib.IMAP4_SSL(self.email_imap_server)
+        try:
+            mail.login(self.email_user, self.email_password)
+            result, data = mail.select('inbox', readonly=True)
+            exists = int(data[0])
+            while not self.stop_event.is_set():
+                # Announce mail that arrived while disconnected as well as during IDLE
+                if self.known is not None and exists > self.known:
+                    self._publish_new(mail, self.known + 1, exists)
+                self.known = exists
+                exists = self._idle(mail)
+                if exists is None:
+                    exists = self.known
+                self.retry_delay = 5
+        finally:
+            try:
+                mail.logout()
+            except Exception:
+                pass
+    
+    def _idle(self, mail):
+        """Run one IDLE cycle and return the new message count, if the server sent one."""
+        tag = mail._new_tag()
+        mail.send(tag + b' IDLE\r\n')
+        
+        # IDLE responses are read straight off the socket: a timeout on
+        # imaplib's buffered file would break every later read on it
+        pending = bytearray()
+        line = self._read_line(mail, pending, self.RESPONSE_TIMEOUT)
+        if not line or not line.startswith(b'+'):
+            raise imaplib.IMAP4.error("server refused IDLE")
+        
+        exists = None
+        deadline = time.time() + self.IDLE_TIMEOUT
+        while exists is None and time.time() < deadline and not self.stop_event.is_set():
+            line = self._read_line(mail, pending, min(self.POLL_INTERVAL, deadline - time.time()))
+            match = re.match(rb'\* (\d+) EXISTS', line or b'')
+            if match:
+                exists = int(match.group(1))
+        
+        mail.send(b'DONE\r\n')
+        while True:
+            line = self._read_line(mail, pending, self.RESPONSE_TIMEOUT)
+            if line is None:
+                raise imaplib.IMAP4.abort("no response to DONE")
+            if line.startswith(tag):
+                return exists
+            match = re.match(rb'\* (\d+) EXISTS', line)
+            if match:
+                exists = int(match.group(1))
+    
+    def _read_line(self, mail, pending, timeout):
+        """Return the next line from the socket, or None if none arrives within timeout."""
+        deadline = time.time() + timeout
+        while b'\n' not in pending:
+            # TLS may already hold decrypted bytes that select can't see
+            if not (hasattr(mail.sock, 'pending') and mail.sock.pending()):
+                remaining = deadline - time.time()
+                if remaining <= 0 or not select.select([mail.sock], [], [], remaining)[0]:
+                    return None
+            data = mail.sock.recv(4096)
+            if not data:
+                raise imaplib.IMAP4.abort("connection closed")
+            pending += data
+        end = pending.index(b'\n') + 1
+        line = bytes(pending[:end])
+        del pending[:end]
+        return line
+    
+    def _publish_new(self, mail, first, last):
+        """Fetch sender and subject of the new messages and publish one event each."""
+        result, data = mail.fetch(f"{first}:{last}", '(BODY.PEEK[HEADER.FIELDS (FROM SUBJECT)])')
+        for part in data:
+            if not isinstance(part, tuple):
+                continue
+            msg = email.message_from_bytes(part[1])
+            sender = email.utils.parseaddr(msg['from'] or '')[0] or msg['from'] or 'Unknown Sender'
+            subject = msg['subject'] or 'No Subject'
+            self.event_bus.publish('new_mail', f"New email from {sender}: {subject}.",
+                                   sender=sender, subject=subject)
+
+class CalendarClient:
+    """Google Calendar client with cached discovery, background token refresh and queued writes.
+    
+    Event inserts are appended to a local queue (persisted to disk) and
+    flushed by a background thread through the Google batch HTTP endpoint,
+    so scheduling never waits on the network and survives connectivity loss.
+    """
+    
+    SCOPES = ['https://www.googleapis.com/auth/calendar']
+    REFRESH_MARGIN = 300      # refresh credentials this many seconds before expiry
+    FLUSH_DELAY = 0.5         # coalesce writes made within this window into one batch
+    MAX_BATCH_SIZE = 50
+    MAX_RETRY_DELAY = 300
+    REJECTED_STATUSES = {400, 404}    # invalid events; retrying can't make these succeed
+    
+    def __init__(self, token_path='token.pickle', credentials_path='credentials.json',
+                 discovery_path='calendar_discovery.json', queue_path='calendar_queue.json'):
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.discovery_path = discovery_path
+        self.queue_path = queue_path
+        self.creds = None
+        self.service = None
+        self.api_lock = threading.RLock()    # httplib2 connections are not thread-safe
+        self.queue_lock = threading.Lock()
+        self.pending = self._load_queue()
+        self.on_rejected = None   # called with the ids of inserts Google rejected
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.threads = []
+    
+    def connect(self):
+        """Load credentials, build the service and start the background threads."""
+        self.creds = self._load_credentials()
+        if not self.creds:
+            return False
+        
+        self.service = self._build_service()
+        for target in (self._refresh_loop, self._flush_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        if self.pending:
+            print(f"📅 Google Calendar: {len(self.pending)} queued event(s) waiting to sync")
+            self.wakeup.set()
+        return True
+    
+    def close(self):
+        """Stop the background threads after a last flush attempt."""
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.service and self.pending:
+            self.flush()
+    
+    def _load_credentials(self):
+        """Load cached OAuth credentials, running the consent flow only if there are none."""
+        creds = None
+        if os.path.exists(self.token_path):
+            with open(self.token_path, 'rb') as token:
+                creds = pickle.load(token)
+        
+        if creds and creds.refresh_token:
+            if not creds.valid:
+                try:
+                    self._refresh_credentials(creds)
+                except Exception as e:
+                    # Keep going offline; the refresh thread retries in the background
+                    print(f"⚠️  Google Calendar: token refresh failed ({e}), will retry")
+            return creds
+        
+        if creds and creds.valid:
+            return creds
+        
+        if not os.path.exists(self.credentials_path):
+            print("⚠️  Google Calendar: credentials.json not found")
+            return None
+        
+        flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.SCOPES)
+        creds = flow.run_local_server(port=0)
+        self._save_credentials(creds)
+        return creds
+    
+    def _refresh_credentials(self, creds):
+        """Refresh the access token and persist it."""
+        with self.api_lock:
+            creds.refresh(Request())
+        self._save_credentials(creds)
+    
+    def _save_credentials(self, creds):
+        with open(self.token_path, 'wb') as token:
+            pickle.dump(creds, token)
+    
+    def _build_service(self):
+        """Build the Calendar service without fetching the discovery document when possible."""
+        if os.path.exists(self.discovery_path):
+            with open(self.discovery_path, 'r', encoding='utf-8') as f:
+                return build_from_document(f.read(), credentials=self.creds)
+        
+        try:
+            # google-api-python-client >= 2.0 ships the discovery documents
+            service = build('calendar', 'v3', credentials=self.creds, static_discovery=True)
+        except TypeError:
+            service = build('calendar', 'v3', credentials=self.creds)
+        
+        try:
+            with open(self.discovery_path, 'w', encoding='utf-8') as f:
+                json.dump(service._rootDesc, f)
+        except (AttributeError, OSError):
+            pass
+        return service
+    
+    def _refresh_loop(self):
+        """Refresh credentials shortly before they expire."""
+        while not self.stop_event.is_set():
+            expiry = getattr(self.creds, 'expiry', None)
+            if expiry:
+                delay = (expiry - datetime.utcnow()).total_seconds() - self.REFRESH_MARGIN
+            else:
+                delay = 1800
+            
+            if delay > 0:
+                self.stop_event.wait(delay)
+                continue
+            
+            try:
+                self._refresh_credentials(self.creds)
+            except Exception as e:
+                print(f"⚠️  Google Calendar: token refresh failed ({e}), retrying in 60s")
+                self.stop_event.wait(60)
+    
+    def _load_queue(self):
+        """Load writes left over from a previous run."""
+        try:
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    
+    def _save_queue(self):
+        tmp_path = self.queue_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.pending, f)
+        os.replace(tmp_path, self.queue_path)
+    
+    def insert_event(self, event):
+        """Queue an event insert and return immediately.
+        
+        The event gets a client-generated id so a retried insert that already
+        reached Google is reported as a duplicate instead of creating a copy.
+        """
+        event = dict(event)
+        event.setdefault('id', uuid.uuid4().hex)
+        with self.queue_lock:
+            self.pending.append(event)
+            self._save_queue()
+        self.wakeup.set()
+        return event['id']
+    
+    def _flush_loop(self):
+        """Flush queued writes as they arrive, backing off while offline."""
+        retry_delay = None
+        while not self.stop_event.is_set():
+            self.wakeup.wait(retry_delay)
+            self.wakeup.clear()
+            if self.stop_event.is_set():
+                break
+            time.sleep(self.FLUSH_DELAY)
+            
+            if self.flush():
+                retry_delay = None
+            else:
+                retry_delay = min((retry_delay or 5) * 2, self.MAX_RETRY_DELAY)
+    
+    def flush(self):
+        """Send queued writes in batch requests. Returns False if any need a retry."""
+        with self.queue_lock:
+            events = list(self.pending)
+        if not events:
+            return True
+        
+        finished = set()
+        rejected = []
+        
+        def on_response(request_id, response, exception):
+            if exception is None:
+                finished.add(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status == 409:
+                # Already inserted by an earlier attempt
+                finished.add(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status in self.REJECTED_STATUSES:
+                print(f"⚠️  Google Calendar rejected event {request_id}: {exception}")
+                finished.add(request_id)
+                rejected.append(request_id)
+            # Anything else (401, 403 rate/quota limits, 429, 5xx) stays queued for the retry
+        
+        try:
+            with self.api_lock:
+                for start in range(0, len(events), self.MAX_BATCH_SIZE):
+                    batch = self.service.new_batch_http_request(callback=on_response)
+                    for event in events[start:start + self.MAX_BATCH_SIZE]:
+                        batch.add(self.service.events().insert(calendarId='primary', body=event),
+                                  request_id=event['id'])
+                    batch.execute()
+        except Exception as e:
+            print(f"⚠️  Google Calendar sync deferred: {e}")
+        
+        with self.queue_lock:
+            self.pending = [event for event in self.pending if event['id'] not in finished]
+            self._save_queue()
+        if rejected and self.on_rejected:
+            self.on_rejected(rejected)
+        return all(event['id'] in finished for event in events)
+
+class CalendarMirror:
+    """Local copy of the primary calendar kept current with incremental sync tokens.
+    
+    Events are indexed by start time so overlap and free/busy queries are a
+    bisect plus a short scan instead of an API round trip.
+    """
+    
+    TIMEZONE = 'Asia/Kolkata'
+    SYNC_INTERVAL = 60
+    FULL_SYNC_DAYS = 30       # how far back the initial full sync reaches
+    
+    REMINDER_LEAD = 10 * 60   # announce events this many seconds before they start
+    
+    def __init__(self, calendar_client, store_path='calendar_mirror.json', event_bus=None):
+        self.calendar_client = calendar_client
+        self.store_path = store_path
+        self.event_bus = event_bus
+        self.reminded = set()
+        self.tz = pytz.timezone(self.TIMEZONE)
+        self.lock = threading.RLock()
+        self.events = {}
+        self.sync_token = None
+        self._index = []          # sorted (start_ts, end_ts, event_id)
+        self._starts = []
+        self._max_duration = 0.0
+        self.stop_event = threading.Event()
+        self._load()
+    
+    def start(self):
+        """Sync in the background for as long as the assistant runs."""
+        thread = threading.Thread(target=self._sync_loop, daemon=True)
+        thread.start()
+    
+    def close(self):
+        self.stop_event.set()
+    
+    def _sync_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"⚠️  Calendar mirror sync failed: {e}")
+            if self.event_bus:
+                self._publish_upcoming()
+            self.stop_event.wait(self.SYNC_INTERVAL)
+    
+    def _publish_upcoming(self):
+        """Publish a reminder for each timed event starting within REMINDER_LEAD."""
+        now = datetime.now(self.tz)
+        for event in self.overlapping(now, now + timedelta(seconds=self.REMINDER_LEAD)):
+            if 'dateTime' not in event.get('start', {}) or event['id'] in self.reminded:
+                continue
+            starts_in = self._parse_time(event['start']) - now.timestamp()
+            if starts_in < 0:
+                continue
+            self.reminded.add(event['id'])
+            minutes = max(1, int(round(starts_in / 60)))
+            summary = event.get('summary', 'Untitled event')
+            self.event_bus.publish('calendar_upcoming',
+                                   f"Reminder: {summary} starts in {minutes} minute{'s' if minutes != 1 else ''}.",
+                                   expires_in=starts_in, event_id=event['id'], summary=summary)
+    
+    def _load(self):
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.events = data.get('events', {})
+            self.sync_token = data.get('sync_token')
+            self._rebuild_index()
+        except (OSError, ValueError):
+            pass
+    
+    def _save(self):
+        tmp_path = self.store_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sync_token': self.sync_token, 'events': self.events}, f)
+        os.replace(tmp_path, self.store_path)
+    
+    def sync(self):
+        """Pull changes since the last sync token, or do a full sync without one."""
+        try:
+            items, next_token = self._fetch(self.sync_token)
+            full = self.sync_token is None
+        except HttpError as e:
+            if e.resp.status != 410:
+                raise
+            # Sync token expired: start over with a full sync
+            items, next_token = self._fetch(None)
+            full = True
+        
+        with self.lock:
+            if full:
+                # Keep placeholders only while their insert is still queued
+                queued = {event['id'] for event in self.calendar_client.pending}
+                self.events = {
+                    event_id: event for event_id, event in self.events.items()
+                    if event.get('_local') and event_id in queued
+                }
+            for event in items:
+                if event.get('status') == 'cancelled':
+                    self.events.pop(event['id'], None)
+                else:
+                    self.events[event['id']] = event
+            self.sync_token = next_token
+            self._rebuild_index()
+            self._save()
+        return len(items)
+    
+    def _fetch(self, sync_token):
+        """Fetch every page of changed events and the token for the next sync."""
+        service = self.calendar_client.service
+        params = {'calendarId': 'primary', 'singleEvents': True, 'maxResults': 250}
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            time_min = datetime.now(pytz.utc) - timedelta(days=self.FULL_SYNC_DAYS)
+            params['timeMin'] = time_min.isoformat()
+        
+        items = []
+        page_token = None
+        while True:
+            if page_token:
+                params['pageToken'] = page_token
+            with self.calendar_client.api_lock:
+                response = service.events().list(**params).execute()
+            items.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return items, response.get('nextSyncToken')
+    
+    def add_local(self, event):
+        """Mirror an event that is queued for insert but not yet synced."""
+        with self.lock:
+            self.events[event['id']] = dict(event, _local=True)
+            self._rebuild_index()
+    
+    def discard_local(self, event_ids):
+        """Drop placeholders for queued inserts that Google rejected."""
+        with self.lock:
+            removed = [self.events.pop(event_id) for event_id in event_ids
+                       if self.events.get(event_id, {}).get('_local')]
+            if removed:
+                self._rebuild_index()
+                self._save()
+    
+    def _rebuild_index(self):
+        index = []
+        for event_id, event in self.events.items():
+            span = self._event_span(event)
+            if span:
+                index.append((span[0], span[1], event_id))
+        index.sort()
+        self._index = index
+        self._starts = [start for start, _, _ in index]
+        self._max_duration = max((end - start for start, end, _ in index), default=0.0)
+    
+    def _event_span(self, event):
+        """Return (start, end) as epoch seconds, or None if the event has no usable time."""
+        try:
+            return self._parse_time(event['start']), self._parse_time(event['end'])
+        except (KeyError, ValueError):
+            return None
+    
+    def _parse_time(self, value):
+        if 'dateTime' in value:
+            parsed = datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = pytz.timezone(value.get('timeZone', self.TIMEZONE)).localize(parsed)
+            return parsed.timestamp()
+        # All-day events are dates in the calendar's time zone
+        day = datetime.strptime(value['date'], '%Y-%m-%d')
+        return self.tz.localize(day).timestamp()
+    
+    def overlapping(self, start, end):
+        """Return events overlapping [start, end), ordered by start time."""
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        with self.lock:
+            lo = bisect.bisect_left(self._starts, start_ts - self._max_duration)
+            hi = bisect.bisect_left(self._starts, end_ts)
+            return [
+                self.events[event_id] for event_start, event_end, event_id in self._index[lo:hi]
+                if event_end > start_ts
+            ]
+    
+    def busy(self, start, end):
+        """Return the events overlapping [start, end) that block the time."""
+        return [event for event in self.overlapping(start, end) if self._blocks_time(event)]
+    
+    @staticmethod
+    def _blocks_time(event):
+        """False for events marked free (all-day events are by default) or declined."""
+        if event.get('transparency') == 'transparent':
+            return False
+        return not any(attendee.get('self') and attendee.get('responseStatus') == 'declined'
+                       for attendee in event.get('attendees', []))
+    
+    def events_on(self, day):
+        """Return events overlapping the given calendar day."""
+        start = self.tz.localize(datetime.combine(day, datetime.min.time()))
+        return self.overlapping(start, start + timedelta(days=1))
+    
+    def describe(self, event):
+        """Return a short spoken description of an event."""
+        summary = event.get('summary', 'Untitled event')
+        if 'dateTime' not in event.get('start', {}):
+            return f"{summary} (all day)"
+        start = datetime.fromtimestamp(self._parse_time(event['start']), self.tz)
+        end = datetime.fromtimestamp(self._parse_time(event['end']), self.tz)
+        return f"{summary} from {start.strftime('%I:%M %p')} to {end.strftime('%I:%M %p')}"
+
 class CalendarTool(BaseTool):
     """LangChain tool for calendar operations."""
     
     name = "calendar_scheduler"
-    description = "Schedule calendar events. Input should be JSON with title, date, and time."
-    calendar_service = None
+    description = ("Schedule or look up calendar events. Input should be JSON with 'action' "
+                   "('schedule', 'list' or 'check'), 'title', 'date' (e.g. 'next friday'), "
+                   "'time' (e.g. '3 pm' or '3 to 4 pm') and optional 'duration' (e.g. '90 minutes'). "
+                   "'list' returns the events on a date, 'check' tells whether a time slot is free. "
+                   "'schedule' refuses slots that clash with existing events; add 'force': true "
+                   "when the user asks to schedule it anyway.")
+    calendar_client = None
+    calendar_mirror = None
     
-    def __init__(self, calendar_service):
+    def __init__(self, calendar_client, calendar_mirror=None):
         super().__init__()
-        self.calendar_service = calendar_service
+        self.calendar_client = calendar_client
+        self.calendar_mirror = calendar_mirror
     
     def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
-        """Schedule a calendar event."""
+        """Schedule or look up calendar events."""
         try:
             # Parse the query as JSON
             params = json.loads(query) if query.startswith('{') else {'title': query}
             
-            if not self.calendar_service:
+            if not self.calendar_client:
                 return "Google Calendar is not configured."
             
-            ist = pytz.timezone('Asia/Kolkata')
-            title = params.get('title', 'New Event')
-            date_str = params.get('date', 'today')
-            time_str = params.get('time', '10:00 AM')
-            
-            # Calculate event datetime
-            if date_str == 'today':
-                event_date = datetime.now(ist)
-            elif date_str == 'tomorrow':
-                event_date = datetime.now(ist) + timedelta(days=1)
-            else:
-                event_date = datetime.now(ist)
-            
-            # Parse time
-            try:
-                time_obj = datetime.strptime(time_str.upper(), '%I:%M %p').time()
-                start_datetime = datetime.combine(event_date.date(), time_obj)
-                end_datetime = start_datetime + timedelta(hours=1)
-            except ValueError:
-                start_datetime = event_date.replace(hour=10, minute=0, second=0, microsecond=0)
-                end_datetime = start_datetime + timedelta(hours=1)
-            
-            # Create event
-            event = {
-                'summary': title,
-                'start': {
-                    'dateTime': start_datetime.isoformat(),
-                    'timeZone': 'Asia/Kolkata',
-                },
-                'end': {
-                    'dateTime': end_datetime.isoformat(),
-                    'timeZone': 'Asia/Kolkata',
-                },
-                'description': 'Event created by Jarvis AI Assistant',
-            }
-            
-            event = self.calendar_service.events().insert(calendarId='primary', body=event).execute()
-            return f"Successfully scheduled '{title}' for {start_datetime.strftime('%B %d at %I:%M %p')}"
+            action = params.get('action', 'schedule')
+            if action == 'list':
+                return self._list_events(params)
+            elif action == 'check':
+                return self._check_free(params)
+            return self._schedule(params)
             
         except Exception as e:
             return f"Error scheduling event: {str(e)}"
+    
+    def _event_window(self, params):
+        """Return the (start, end) datetimes described by params."""
+        ist = pytz.timezone('Asia/Kolkata')
+        now = datetime.now(ist)
+        date_slots = SLOT_PARSER.parse(str(params.get('date', 'today')), now)
+        time_slots = SLOT_PARSER.parse(str(params.get('time', '10:00 AM')), now)
+        
+        event_date = date_slots['date'] or time_slots['date'] or now.date()
+        start_time = time_slots['time'] or date_slots['time'] or datetime.min.time().replace(hour=10)
+        start_datetime = ist.localize(datetime.combine(event_date, start_time))
+        
+        # End from an explicit range, then a duration, else one hour
+        end_time = time_slots['end_time'] or date_slots['end_time']
+        duration = SLOT_PARSER.parse(str(params.get('duration', '')), now)['duration']
+        if end_time and end_time > start_time:
+            end_datetime = ist.localize(datetime.combine(event_date, end_time))
+        elif duration:
+            end_datetime = start_datetime + timedelta(seconds=duration)
+        else:
+            end_datetime = start_datetime + timedelta(hours=1)
+        return start_datetime, end_datetime
+    
+    def _schedule(self, params):
+        """Queue a new event after checking the local mirror for conflicts."""
+        title = params.get('title', 'New Event')
+        start_datetime, end_datetime = self._event_window(params)
+        
+        if self.calendar_mirror and not params.get('force'):
+            conflicts = self.calendar_mirror.busy(start_datetime, end_datetime)
+            if conflicts:
+                busy = ", ".join(self.calendar_mirror.describe(event) for event in conflicts)
+                return (f"'{title}' at {start_datetime.strftime('%I:%M %p')} overlaps with {busy}. "
+                        f"I haven't scheduled it - ask me to schedule it anyway if you want both.")
+        
+        # Create event
+        event = {
+            'summary': title,
+            'start': {
+                'dateTime': start_datetime.replace(tzinfo=None).isoformat(),
+                'timeZone': 'Asia/Kolkata',
+            },
+            'end': {
+                'dateTime': end_datetime.replace(tzinfo=None).isoformat(),
+                'timeZone': 'Asia/Kolkata',
+            },
+            'description': 'Event created by Jarvis AI Assistant',
+        }
+        
+        event_id = self.calendar_client.insert_event(event)
+        if self.calendar_mirror:
+            self.calendar_mirror.add_local(dict(event, id=event_id))
+        return f"Successfully scheduled '{title}' for {start_datetime.strftime('%B %d at %I:%M %p')}"
+    
+    def _list_events(self, params):
+        """List the events on a day from the local mirror."""
+        if not self.calendar_mirror:
+            return "Calendar lookups are not available."
+        day = self._event_window(params)[0].date()
+        events = self.calendar_mirror.events_on(day)
+        when = day.strftime('%A, %B %d')
+        if not events:
+            return f"You have nothing scheduled on {when}."
+        listing = "; ".join(self.calendar_mirror.describe(event) for event in events)
+        return f"On {when} you have {len(events)} event{'s' if len(events) != 1 else ''}: {listing}"
+    
+    def _check_free(self, params):
+        """Tell whether a time slot is free according to the local mirror."""
+        if not self.calendar_mirror:
+            return "Calendar lookups are not available."
+        start_datetime, end_datetime = self._event_window(params)
+        conflicts = self.calendar_mirror.busy(start_datetime, end_datetime)
+        when = start_datetime.strftime('%B %d at %I:%M %p')
+        if not conflicts:
+            return f"You're free on {when}."
+        busy = ", ".join(self.calendar_mirror.describe(event) for event in conflicts)
+        return f"You're busy on {when}: {busy}"
 
 class EmailTool(BaseTool):
     """LangChain tool for email operations."""
@@ -255,7 +1456,7 @@ class WeatherTool(BaseTool):
         try:
             location = query.strip() or "current location"
             url = f"http://wttr.in/{location}?format=j1"
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -275,11 +1476,247 @@ class WeatherTool(BaseTool):
         except Exception as e:
             return f"Weather check failed: {str(e)}"
 
+class MusicLibrary:
+    """Persistent index of local audio files with trigram fuzzy search.
+    
+    Rescans only re-read tags for files whose mtime changed, and lookups
+    score candidates from a trigram inverted index so noisy speech-to-text
+    titles still resolve quickly over large libraries.
+    """
+    
+    AUDIO_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.aac', '.ogg', '.opus', '.wav', '.wma'}
+    MIN_SCORE = 0.5
+    
+    def __init__(self, music_dirs=None, index_path='music_index.json'):
+        if music_dirs is None:
+            configured = os.getenv('MUSIC_DIRS')
+            music_dirs = configured.split(os.pathsep) if configured else [os.path.expanduser('~/Music')]
+        self.music_dirs = [d for d in music_dirs if d]
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self.tracks = {}
+        self._keys = []           # (track path, normalized key, trigram count)
+        self._postings = {}       # trigram -> sorted list of key ids
+        self._length_starts = []
+    
+    def start(self):
+        """Load the saved index and rescan in the background.
+        
+        Searches return no matches until the saved index is loaded, then use
+        it while the rescan runs.
+        """
+        thread = threading.Thread(target=self._load_and_scan, daemon=True)
+        thread.start()
+    
+    def _load_and_scan(self):
+        self._load()
+        self.scan()
+    
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                tracks = json.load(f)
+            self._build_search_index(tracks)
+        except (OSError, ValueError):
+            pass
+    
+    def _save(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.tracks, f)
+        os.replace(tmp_path, self.index_path)
+    
+    def scan(self):
+        """Walk the music folders, reading tags only for new or modified files."""
+        try:
+            old_tracks = self.tracks
+            tracks = {}
+            changed = 0
+            for music_dir in self.music_dirs:
+                for path, mtime in self._walk(music_dir):
+                    known = old_tracks.get(path)
+                    if known and known['mtime'] == mtime:
+                        tracks[path] = known
+                    else:
+                        tracks[path] = self._read_track(path, mtime)
+                        changed += 1
+            
+            removed = len(set(old_tracks) - set(tracks))
+            if changed or removed:
+                self._build_search_index(tracks)
+                self._save()
+                print(f"🎵 Music library: {len(tracks)} tracks ({changed} updated, {removed} removed)")
+            
+        except Exception as e:
+            print(f"Music library scan error: {e}")
+    
+    def _walk(self, directory):
+        """Yield (path, mtime) for every audio file below directory."""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._walk(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in self.AUDIO_EXTENSIONS:
+                    yield entry.path, entry.stat().st_mtime
+            except OSError:
+                continue
+    
+    def _read_track(self, path, mtime):
+        """Read title, artist, album and duration, falling back to the file name."""
+        track = {'path': path, 'mtime': mtime, 'title': None, 'artist': None, 'album': None, 'duration': None}
+        if mutagen:
+            try:
+                audio = mutagen.File(path, easy=True)
+                if audio is not None:
+                    tags = audio.tags or {}
+                    for field in ('title', 'artist', 'album'):
+                        values = tags.get(field)
+                        if values:
+                            track[field] = values[0]
+                    if audio.info and getattr(audio.info, 'length', None):
+                        track['duration'] = round(audio.info.length, 1)
+            except Exception:
+                pass
+        
+        if not track['title']:
+            # "Artist - Title.mp3" is the most common naming scheme
+            stem = os.path.splitext(os.path.basename(path))[0]
+            if ' - ' in stem and not track['artist']:
+                track['artist'], track['title'] = [part.strip() for part in stem.split(' - ', 1)]
+            else:
+                track['title'] = stem
+        return track
+    
+    @staticmethod
+    def _normalize(text):
+        return " ".join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+    
+    @staticmethod
+    def _trigrams(text):
+        grams = set()
+        for word in text.split():
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                grams.add(padded[i:i + 3])
+        return grams
+    
+    def _build_search_index(self, tracks=None):
+        """Index each track by title and by "title artist" so either phrasing matches.
+        
+        Key ids are assigned in order of trigram count, so every posting list
+        is sorted by key length and a length range is a slice of it. The index
+        is built outside the lock and swapped in with tracks at the end.
+        """
+        tracks = self.tracks if tracks is None else tracks
+        entries = []
+        for path, track in tracks.items():
+            title = self._normalize(track.get('title') or '')
+            variants = {title}
+            if track.get('artist'):
+                variants.add(self._normalize(f"{title} {track['artist']}"))
+            for key in variants:
+                grams = self._trigrams(key)
+                if grams:
+                    entries.append((len(grams), path, key, grams))
+        entries.sort(key=lambda entry: entry[0])
+        
+        keys = []
+        postings = {}
+        length_starts = []        # length_starts[n] = first key id with more than n - 1 trigrams
+        for key_id, (gram_count, path, key, grams) in enumerate(entries):
+            while len(length_starts) <= gram_count:
+                length_starts.append(key_id)
+            keys.append((path, key, gram_count))
+            for gram in grams:
+                postings.setdefault(gram, []).append(key_id)
+        with self.lock:
+            self.tracks = tracks
+            self._keys = keys
+            self._postings = postings
+            self._length_starts = length_starts
+    
+    def search(self, query, limit=5):
+        """Return up to limit (score, track) pairs best matching query."""
+        grams = self._trigrams(self._normalize(query))
+        if not grams:
+            return []
+        
+        with self.lock:
+            keys, postings, tracks = self._keys, self._postings, self.tracks
+            length_starts = self._length_starts
+        
+        # Scan keys one length at a time, most promising length first: a key
+        # with n trigrams scores at most 2 * min(q, n) / (q + n), so the scan
+        # stops once no remaining length can beat the results already found
+        q = len(grams)
+        bound = lambda n: 2.0 * min(q, n) / (q + n)
+        lengths = sorted(range(1, len(length_starts)), key=bound, reverse=True)
+        query_postings = [postings.get(gram, []) for gram in grams]
+        best = {}
+        floor = self.MIN_SCORE
+        for gram_count in lengths:
+            if bound(gram_count) < floor:
+                break
+            first = length_starts[gram_count]
+            last = length_starts[gram_count + 1] if gram_count + 1 < len(length_starts) else len(keys)
+            if first == last:
+                continue
+            
+            # A key here needs `needed` shared trigrams to reach the floor, so it
+            # must appear in one of the rarest q - needed + 1 posting slices;
+            # the commoner slices are only counted for those candidates
+            needed = math.ceil(floor * (q + gram_count) / 2 - 1e-9)
+            slices = sorted((posting[bisect.bisect_left(posting, first):bisect.bisect_left(posting, last)]
+                             for posting in query_postings), key=len)
+            hits = Counter()
+            for key_ids in slices[:q - needed + 1]:
+                hits.update(key_ids)
+            if not hits:
+                continue
+            for key_ids in slices[q - needed + 1:]:
+                hits.update(filter(hits.__contains__, key_ids))
+            if max(hits.values()) < needed:
+                continue
+            
+            # Every key here has the same length, so score follows the shared trigram count
+            for key_id, common in hits.most_common(limit):
+                score = 2.0 * common / (q + gram_count)
+                if score < floor:
+                    break
+                path = keys[key_id][0]
+                if score > best.get(path, 0.0):
+                    best[path] = score
+            if len(best) >= limit:
+                floor = max(floor, sorted(best.values(), reverse=True)[limit - 1])
+        
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, tracks[path]) for path, score in ranked if score >= self.MIN_SCORE]
+    
+    def play(self, track):
+        """Open a track in the system's default player."""
+        path = track['path']
+        if platform.system() == "Windows":
+            os.startfile(path)
+        elif platform.system() == "Darwin":
+            subprocess.Popen(['open', path])
+        else:
+            subprocess.Popen(['xdg-open', path])
+
 class MusicTool(BaseTool):
     """LangChain tool for music operations."""
     
     name = "music_player"
-    description = "Play music on various platforms. Input should be JSON with 'song' and 'platform' (spotify/youtube/apple)."
+    description = ("Play music from the local library or on various platforms. Input should be JSON with 'song' "
+                   "and, only if the user named one, 'platform' (spotify/youtube/apple).")
+    library = None
+    
+    def __init__(self, library=None):
+        super().__init__()
+        self.library = library
     
     def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
         """Play music."""
@@ -287,11 +1724,21 @@ class MusicTool(BaseTool):
             if query.startswith('{'):
                 params = json.loads(query)
                 song = params.get('song', 'music')
-                platform = params.get('platform', 'youtube')
+                platform = params.get('platform')
             else:
                 song = query
-                platform = 'youtube'
+                platform = None
             
+            # Prefer a local file unless the user asked for a specific service
+            if self.library and not platform:
+                matches = self.library.search(song, limit=1)
+                if matches:
+                    track = matches[0][1]
+                    self.library.play(track)
+                    artist = f" by {track['artist']}" if track.get('artist') else ""
+                    return f"Playing '{track['title']}'{artist} from your library"
+            
+            platform = platform or 'youtube'
             music_platforms = {
                 'spotify': f'https://open.spotify.com/search/{song.replace(" ", "%20")}',
                 'youtube': f'https://www.youtube.com/results?search_query={song.replace(" ", "+")}',
@@ -311,9 +1758,11 @@ class TimerTool(BaseTool):
     
     name = "timer_manager"
     description = "Set timers. Input should be duration in seconds or descriptive text like '5 minutes'."
+    event_bus = None
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         super().__init__()
+        self.event_bus = event_bus
         self.active_timers = {}
         self.timer_counter = 0
     
@@ -330,17 +1779,11 @@ class TimerTool(BaseTool):
             def timer_thread():
                 time.sleep(duration)
                 if timer_id in self.active_timers:
-                    print(f"\n⏰ TIMER COMPLETE! Your {time_str} timer is done!")
-                    # System notification
-                    try:
-                        if platform.system() == "Windows":
-                            subprocess.run(['msg', '*', f'Jarvis: Timer for {time_str} complete!'])
-                        elif platform.system() == "Darwin":
-                            subprocess.run(['osascript', '-e', f'display notification "Timer complete!" with title "Jarvis - {time_str}"'])
-                        elif platform.system() == "Linux":
-                            subprocess.run(['notify-send', 'Jarvis Timer', f'{time_str} complete!'])
-                    except:
-                        pass
+                    if self.event_bus:
+                        self.event_bus.publish('timer_fired', f"Your {time_str} timer is done!",
+                                               timer_id=timer_id, duration=duration)
+                    else:
+                        print(f"\n⏰ TIMER COMPLETE! Your {time_str} timer is done!")
                     del self.active_timers[timer_id]
             
             self.active_timers[timer_id] = threading.Thread(target=timer_thread)
@@ -354,16 +1797,9 @@ class TimerTool(BaseTool):
     
     def _parse_duration(self, text):
         """Parse duration from text."""
-        patterns = [
-            (r'(\d+)\s*(?:minutes?|mins?)', lambda x: int(x) * 60),
-            (r'(\d+)\s*(?:seconds?|secs?)', lambda x: int(x)),
-            (r'(\d+)\s*(?:hours?|hrs?)', lambda x: int(x) * 3600),
-        ]
-        
-        for pattern, converter in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                return converter(match.group(1))
+        duration = SLOT_PARSER.parse(text)['duration']
+        if duration:
+            return duration
         
         # Try to extract just numbers
         numbers = re.findall(r'\d+', text)
@@ -419,7 +1855,7 @@ class NewsTool(BaseTool):
                 'pageSize': 3
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_session().get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -443,7 +1879,7 @@ class NewsTool(BaseTool):
         """Get news from free sources."""
         try:
             url = "https://rss.cnn.com/rss/edition.rss"
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             
             if response.status_code == 200:
                 from xml.etree import ElementTree as ET
@@ -461,15 +1897,337 @@ class NewsTool(BaseTool):
         except Exception as e:
             return f"News unavailable: {str(e)}"
 
+def configure_tts_engine(engine):
+    """Apply Jarvis's voice, rate and volume to a pyttsx3 engine."""
+    voices = engine.getProperty('voices')
+    if voices:
+        for voice in voices:
+            if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        else:
+            engine.setProperty('voice', voices[0].id)
+    
+    engine.setProperty('rate', 180)
+    engine.setProperty('volume', 0.9)
+
+def frame_rms(frame):
+    """Root-mean-square energy of a frame of 16-bit mono samples."""
+    if audioop:
+        return audioop.rms(frame, 2)
+    samples = array.array('h', frame)
+    if not samples:
+        return 0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+class SharedAudioRing:
+    """Single-producer ring of fixed-size audio frames in shared memory.
+    
+    The producer copies a frame into its slot and then bumps the shared
+    frame counter; readers keep their own position and can detect when the
+    producer has lapped them, so frames move between processes without
+    pickling.
+    """
+    
+    def __init__(self, frame_bytes, slots):
+        self.frame_bytes = frame_bytes
+        self.slots = slots
+        self.shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+        self.written = multiprocessing.Value('q', 0, lock=False)
+    
+    def write(self, frame):
+        position = self.written.value
+        offset = (position % self.slots) * self.frame_bytes
+        self.shm.buf[offset:offset + len(frame)] = frame
+        self.written.value = position + 1
+    
+    def read(self, position):
+        """Return the frame at position, or None if it has already been overwritten."""
+        if self.written.value - position > self.slots:
+            return None
+        offset = (position % self.slots) * self.frame_bytes
+        frame = bytes(self.shm.buf[offset:offset + self.frame_bytes])
+        if self.written.value - position >= self.slots:
+            return None
+        return frame
+    
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _audio_capture_worker(ring, source, sample_rate, frame_samples, stats, stop_event):
+    """Capture process: read frames from the microphone (or a synthetic source) into the ring."""
+    frame_seconds = frame_samples / sample_rate
+    if source == 'synthetic':
+        # Alternating one-second stretches of silence and "speech"
+        loud = array.array('h', [8000 if i % 2 else -8000 for i in range(frame_samples)]).tobytes()
+        quiet = array.array('h', [50 if i % 2 else -50 for i in range(frame_samples)]).tobytes()
+        deadline = time.perf_counter()
+        while not stop_event.is_set():
+            stats['capture_heartbeat'].value = time.time()
+            position = ring.written.value
+            ring.write(quiet if (position * frame_seconds) % 2.0 < 1.0 else loud)
+            deadline += frame_seconds
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > frame_seconds:
+                # A real device would have overrun its buffer by now
+                stats['capture_late'].value += 1
+                deadline = time.perf_counter()
+        return
+    
+    import pyaudio
+    audio = pyaudio.PyAudio()
+    stream = audio.open(format=pyaudio.paInt16, channels=1, rate=sample_rate,
+                        input=True, frames_per_buffer=frame_samples)
+    try:
+        while not stop_event.is_set():
+            stats['capture_heartbeat'].value = time.time()
+            try:
+                frame = stream.read(frame_samples, exception_on_overflow=True)
+            except IOError:
+                stats['capture_overruns'].value += 1
+                continue
+            ring.write(frame)
+    finally:
+        stream.stop_stream()
+        stream.close()
+        audio.terminate()
+
+def _audio_vad_worker(ring, sample_rate, frame_samples, stats, muted, utterances, stop_event):
+    """VAD process: find phrases in the ring by energy and report their frame ranges."""
+    frame_seconds = frame_samples / sample_rate
+    pre_roll = int(0.3 / frame_seconds)
+    pause_frames = int(0.8 / frame_seconds)
+    max_frames = int(AudioWorkerPool.MAX_PHRASE_SECONDS / frame_seconds)
+    calibration_frames = int(1.0 / frame_seconds)
+    ambient = []
+    start = None
+    silence = 0
+    
+    read_pos = stats['vad_position']
+    while not stop_event.is_set():
+        stats['vad_heartbeat'].value = time.time()
+        position = read_pos.value
+        if position >= ring.written.value:
+            time.sleep(frame_seconds / 2)
+            continue
+        
+        frame = ring.read(position)
+        if frame is None:
+            # Lapped by the producer: skip to the oldest frame still in the ring
+            skip_to = ring.written.value - ring.slots + 1
+            stats['vad_dropped'].value += skip_to - position
+            read_pos.value = skip_to
+            start = None
+            continue
+        read_pos.value = position + 1
+        stats['vad_processed'].value += 1
+        
+        energy = frame_rms(frame)
+        threshold = stats['energy_threshold']
+        if threshold.value <= 0:
+            # Calibrate like adjust_for_ambient_noise: ambient energy times the dynamic ratio
+            ambient.append(energy)
+            if len(ambient) >= calibration_frames:
+                threshold.value = max(300.0, sum(ambient) / len(ambient) * 1.5)
+            continue
+        
+        if muted.value:
+            start = None
+            continue
+        
+        if start is None:
+            if energy > threshold.value:
+                start = max(position - pre_roll, 0)
+                silence = 0
+        else:
+            silence = silence + 1 if energy <= threshold.value else 0
+            if silence >= pause_frames or position - start >= max_frames:
+                utterances.put((start, position + 1))
+                start = None
+
+def _audio_tts_worker(jobs, done, stats, stop_event):
+    """TTS process: synthesize and play queued text."""
+    import pyttsx3
+    engine = pyttsx3.init()
+    configure_tts_engine(engine)
+    while not stop_event.is_set():
+        stats['tts_heartbeat'].value = time.time()
+        try:
+            job_id, text = jobs.get(timeout=1)
+        except queue.Empty:
+            continue
+        engine.say(text)
+        engine.runAndWait()
+        done.put(job_id)
+
+class AudioWorkerPool:
+    """Runs audio capture, VAD and TTS in supervised worker processes.
+    
+    Capture writes into a SharedAudioRing so neither the GIL nor a busy agent
+    in the main process can stall it; the VAD worker only sends frame ranges
+    back, and the main process copies phrase audio out of shared memory.
+    A monitor thread restarts any worker that dies or stops heart-beating.
+    """
+    
+    SAMPLE_RATE = 16000
+    FRAME_SAMPLES = 512
+    BUFFER_SECONDS = 30
+    MAX_PHRASE_SECONDS = 12
+    HEALTH_INTERVAL = 1.0
+    STALE_AFTER = 5.0
+    STARTUP_GRACE = 30.0      # spawned workers re-import this module before their first heartbeat
+    
+    def __init__(self, source='microphone', tts=True):
+        self.source = source
+        self.ring = SharedAudioRing(self.FRAME_SAMPLES * 2, int(self.BUFFER_SECONDS * self.SAMPLE_RATE / self.FRAME_SAMPLES))
+        self.stop_event = multiprocessing.Event()
+        self.muted = multiprocessing.Value('b', 0, lock=False)
+        self.utterances = multiprocessing.Queue()
+        self.tts_jobs = multiprocessing.Queue()
+        self.tts_done = multiprocessing.Queue()
+        self.stats = {
+            'capture_heartbeat': multiprocessing.Value('d', 0.0, lock=False),
+            'capture_overruns': multiprocessing.Value('q', 0, lock=False),
+            'capture_late': multiprocessing.Value('q', 0, lock=False),
+            'vad_heartbeat': multiprocessing.Value('d', 0.0, lock=False),
+            'vad_position': multiprocessing.Value('q', 0, lock=False),
+            'vad_processed': multiprocessing.Value('q', 0, lock=False),
+            'vad_dropped': multiprocessing.Value('q', 0, lock=False),
+            'energy_threshold': multiprocessing.Value('d', 0.0, lock=False),
+            'tts_heartbeat': multiprocessing.Value('d', 0.0, lock=False),
+        }
+        self.workers = {
+            'capture': (_audio_capture_worker, (self.ring, source, self.SAMPLE_RATE, self.FRAME_SAMPLES, self.stats, self.stop_event)),
+            'vad': (_audio_vad_worker, (self.ring, self.SAMPLE_RATE, self.FRAME_SAMPLES, self.stats, self.muted, self.utterances, self.stop_event)),
+        }
+        if tts:
+            self.workers['tts'] = (_audio_tts_worker, (self.tts_jobs, self.tts_done, self.stats, self.stop_event))
+        self.processes = {}
+        self.restarts = Counter()
+        self.tts_counter = 0
+    
+    def start(self):
+        for name in self.workers:
+            self._spawn(name)
+        thread = threading.Thread(target=self._monitor, daemon=True)
+        thread.start()
+        print("✅ Audio workers: " + ", ".join(self.workers))
+    
+    def _spawn(self, name):
+        target, args = self.workers[name]
+        self.stats[f'{name}_heartbeat'].value = time.time() + self.STARTUP_GRACE
+        process = multiprocessing.Process(target=target, args=args, name=f"jarvis-{name}", daemon=True)
+        process.start()
+        self.processes[name] = process
+    
+    def _monitor(self):
+        """Restart workers that crashed or hung."""
+        while not self.stop_event.is_set():
+            for name, process in list(self.processes.items()):
+                heartbeat = self.stats[f'{name}_heartbeat'].value
+                # TTS blocks for the length of an utterance, so only liveness is checked
+                hung = name != 'tts' and time.time() - heartbeat > self.STALE_AFTER
+                if process.is_alive() and not hung:
+                    continue
+                print(f"⚠️  Audio worker '{name}' {'hung' if hung else 'crashed'}, restarting")
+                if process.is_alive():
+                    process.terminate()
+                process.join(timeout=1)
+                self.restarts[name] += 1
+                self._spawn(name)
+            self.stop_event.wait(self.HEALTH_INTERVAL)
+    
+    def read_frames(self, start, end):
+        """Copy frames [start, end) out of shared memory, or None if any were overwritten."""
+        frames = []
+        for position in range(start, end):
+            frame = self.ring.read(position)
+            if frame is None:
+                return None
+            frames.append(frame)
+        return b"".join(frames)
+    
+    def next_utterance(self, timeout):
+        """Return the next detected phrase as sr.AudioData, or None after timeout."""
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            try:
+                start, end = self.utterances.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            data = self.read_frames(start, end)
+            if data:
+                return sr.AudioData(data, self.SAMPLE_RATE, 2)
+    
+    def say(self, text):
+        """Speak text in the TTS worker, muting VAD so Jarvis doesn't hear itself."""
+        self.tts_counter += 1
+        job_id = self.tts_counter
+        self.muted.value = 1
+        try:
+            self.tts_jobs.put((job_id, text))
+            deadline = time.time() + 10 + len(text.split()) / 2
+            while time.time() < deadline:
+                try:
+                    if self.tts_done.get(timeout=deadline - time.time()) == job_id:
+                        break
+                except queue.Empty:
+                    break
+        finally:
+            time.sleep(0.3)
+            self.muted.value = 0
+            # Drop anything picked up while speaking
+            while True:
+                try:
+                    self.utterances.get_nowait()
+                except queue.Empty:
+                    break
+    
+    def snapshot(self):
+        """Return counters for monitoring and stress tests."""
+        counters = {name: value.value for name, value in self.stats.items() if not name.endswith('heartbeat')}
+        counters['captured'] = self.ring.written.value
+        counters['restarts'] = dict(self.restarts)
+        return counters
+    
+    def close(self):
+        self.stop_event.set()
+        for process in self.processes.values():
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close(unlink=True)
+
 class AgenticJarvis:
-    def __init__(self, mistral_api_key=None):
-        """Initialize the LangChain-powered Jarvis assistant."""
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.tts_engine = pyttsx3.init()
+    def __init__(self, mistral_api_key=None, headless=False):
+        """Initialize the LangChain-powered Jarvis assistant.
+        
+        With headless=True no microphone or TTS engine is opened, which is
+        what batch runs use.
+        """
+        self.headless = headless
+        self.audio_pool = None
+        if not headless and os.getenv('AUDIO_WORKERS', '0') == '1':
+            # Capture, VAD and TTS run in worker processes instead of this one
+            self.audio_pool = AudioWorkerPool()
+        in_process_audio = not headless and self.audio_pool is None
+        self.recognizer = None if headless else sr.Recognizer()
+        self.microphone = sr.Microphone() if in_process_audio else None
+        self.tts_engine = pyttsx3.init() if in_process_audio else None
         self.mistral_api_key = mistral_api_key
+        self.idle = threading.Event()
+        self.speech_lock = threading.RLock()
+        self.announcements = queue.Queue()    # notification text waiting for the main loop
         self.listening_for_wake_word = True
         self.wake_words = ['hey jarvis', 'jarvis', 'hey davis', 'davis']
+        self.pending_continuation = None
         
         # Load configurations
         self.email_config = {
@@ -480,88 +2238,77 @@ class AgenticJarvis:
         }
         self.news_api_key = os.getenv('NEWS_API_KEY')
         
+        # Events from tools are announced by a single dispatcher
+        self.event_bus = EventBus()
+        
         # Setup Google Calendar
-        self.calendar_service = None
+        self.calendar_client = None
+        self.calendar_mirror = None
         self.setup_calendar_api()
         
+        # Index local music in the background
+        self.music_library = MusicLibrary()
+        self.music_library.start()
+        
         # Configure TTS and microphone
-        self.setup_tts()
-        self.setup_microphone()
+        if in_process_audio:
+            self.setup_tts()
+            self.setup_microphone()
+        elif self.audio_pool:
+            self.audio_pool.start()
         
         # Initialize LangChain components
         self.setup_langchain()
         
-        self.display_capabilities()
+        # Push notifications: new mail over IMAP IDLE, announced between turns
+        self.mail_watcher = None
+        if not headless:
+            if self.email_config['user'] and self.email_config['password']:
+                self.mail_watcher = MailWatcher(self.email_config, self.event_bus)
+                self.mail_watcher.start()
+            NotificationDispatcher(self, self.event_bus).start()
+        
+        if not headless:
+            self.display_capabilities()
     
     def setup_calendar_api(self):
         """Setup Google Calendar API."""
         try:
-            SCOPES = ['https://www.googleapis.com/auth/calendar']
-            creds = None
-            
-            if os.path.exists('token.pickle'):
-                with open('token.pickle', 'rb') as token:
-                    creds = pickle.load(token)
-            
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
-                else:
-                    if os.path.exists('credentials.json'):
-                        flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-                        creds = flow.run_local_server(port=0)
-                    else:
-                        print("⚠️  Google Calendar: credentials.json not found")
-                        return
-                
-                with open('token.pickle', 'wb') as token:
-                    pickle.dump(creds, token)
-            
-            self.calendar_service = build('calendar', 'v3', credentials=creds)
+            client = CalendarClient()
+            if client.connect():
+                self.calendar_client = client
+                self.calendar_mirror = CalendarMirror(client, event_bus=self.event_bus)
+                client.on_rejected = self.calendar_mirror.discard_local
+                self.calendar_mirror.start()
             
         except Exception as e:
             print(f"Calendar API setup error: {e}")
-            self.calendar_service = None
+            self.calendar_client = None
     
     def setup_langchain(self):
         """Initialize LangChain components."""
         try:
             # Initialize LLM
-            if self.mistral_api_key:
-                self.llm = MistralLLM(api_key=self.mistral_api_key)
-                print("✅ Mistral LLM: Ready")
-            else:
+            self.llm = self.setup_llm()
+            if not self.llm:
                 print("⚠️  No LLM configured - using basic responses")
-                self.llm = None
             
             # Initialize tools
             self.tools = [
-                CalendarTool(self.calendar_service),
+                CalendarTool(self.calendar_client, self.calendar_mirror),
                 EmailTool(self.email_config),
                 WeatherTool(),
-                MusicTool(),
-                TimerTool(),
+                MusicTool(self.music_library),
+                TimerTool(self.event_bus),
                 NewsTool(self.news_api_key)
             ]
             
             # Initialize memory
-            self.memory = ConversationBufferWindowMemory(
-                memory_key="chat_history",
-                k=10,
-                return_messages=True
-            )
+            self.memory = self.create_memory()
             
             # Initialize agent if LLM is available
             if self.llm:
-                self.agent = initialize_agent(
-                    tools=self.tools,
-                    llm=self.llm,
-                    agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,
-                    memory=self.memory,
-                    verbose=False,
-                    max_iterations=3,
-                    early_stopping_method="generate"
-                )
+                self.agent = self.create_agent(self.memory)
                 print("✅ LangChain Agent: Ready")
             else:
                 self.agent = None
@@ -571,6 +2318,114 @@ class AgenticJarvis:
             print(f"LangChain setup error: {e}")
             self.agent = None
     
+    def setup_llm(self):
+        """Build the LLM from LLM_BACKEND, LLM_FALLBACK and LLM_FAST.
+        
+        Each setting names a backend ('mistral' or 'local'); LLM_BACKEND
+        defaults to mistral when an API key is set and local otherwise.
+        """
+        backends = {}
+        if self.mistral_api_key:
+            backends['mistral'] = MistralLLM(api_key=self.mistral_api_key)
+        
+        model_path = os.getenv('LOCAL_MODEL_PATH')
+        if model_path and Llama is not None and os.path.exists(model_path):
+            threads = os.getenv('LOCAL_MODEL_THREADS')
+            local = LocalLlamaLLM(
+                model_path=model_path,
+                n_ctx=int(os.getenv('LOCAL_MODEL_CTX', '4096')),
+                n_threads=int(threads) if threads else None
+            )
+            try:
+                local.load()
+                backends['local'] = local
+                print("✅ Local LLM: Ready")
+            except Exception as e:
+                print(f"⚠️  Local LLM failed to load: {e}")
+        elif model_path:
+            print("⚠️  Local LLM: needs llama-cpp-python and an existing LOCAL_MODEL_PATH")
+        
+        primary_name = os.getenv('LLM_BACKEND', 'mistral' if 'mistral' in backends else 'local').lower()
+        if backends and primary_name not in backends:
+            print(f"⚠️  LLM_BACKEND '{primary_name}' is not available, using {next(iter(backends))}")
+        primary = backends.get(primary_name) or next(iter(backends.values()), None)
+        if not primary:
+            return None
+        fallback = backends.get(os.getenv('LLM_FALLBACK', '').lower())
+        fast = backends.get(os.getenv('LLM_FAST', '').lower())
+        
+        if primary is backends.get('mistral'):
+            print("✅ Mistral LLM: Ready")
+        if fallback is None and fast is None:
+            return primary
+        return TieredLLM(
+            primary=primary,
+            fallback=fallback,
+            fast=fast,
+            fast_max_words=int(os.getenv('FAST_TURN_MAX_WORDS', '8'))
+        )
+    
+    @property
+    def listening_for_wake_word(self):
+        """True between conversations; Jarvis is idle for announcements the whole time."""
+        return self._listening_for_wake_word
+    
+    @listening_for_wake_word.setter
+    def listening_for_wake_word(self, value):
+        self._listening_for_wake_word = value
+        if value:
+            self.idle.set()
+        else:
+            self.idle.clear()
+    
+    def deliver_announcements(self, timeout=30):
+        """Between conversation turns, speak whatever the dispatcher has queued."""
+        self.idle.set()
+        self.event_bus.wait_handled(timeout)
+        self.idle.clear()
+        self.speak_announcements()
+    
+    def speak_announcements(self):
+        """Speak notifications handed over by announce(); call from the main loop only."""
+        while True:
+            try:
+                text = self.announcements.get_nowait()
+            except queue.Empty:
+                return
+            print("\n🔔 Notification")
+            self.speak(text)
+    
+    def shutdown(self):
+        """Release background resources before exiting."""
+        if self.audio_pool:
+            self.audio_pool.close()
+        if self.mail_watcher:
+            self.mail_watcher.close()
+        if self.calendar_mirror:
+            self.calendar_mirror.close()
+        if self.calendar_client:
+            self.calendar_client.close()
+    
+    def create_memory(self):
+        """Create a fresh conversation memory window."""
+        return ConversationBufferWindowMemory(
+            memory_key="chat_history",
+            k=10,
+            return_messages=True
+        )
+    
+    def create_agent(self, memory):
+        """Create a LangChain agent over the shared tools with its own memory."""
+        return initialize_agent(
+            tools=self.tools,
+            llm=self.llm,
+            agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,
+            memory=memory,
+            verbose=False,
+            max_iterations=3,
+            early_stopping_method="generate"
+        )
+    
     def display_capabilities(self):
         """Display assistant capabilities."""
         print("\n" + "="*70)
@@ -593,17 +2448,7 @@ class AgenticJarvis:
     
     def setup_tts(self):
         """Configure text-to-speech settings."""
-        voices = self.tts_engine.getProperty('voices')
-        if voices:
-            for voice in voices:
-                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
-                    break
-            else:
-                self.tts_engine.setProperty('voice', voices[0].id)
-        
-        self.tts_engine.setProperty('rate', 180)
-        self.tts_engine.setProperty('volume', 0.9)
+        configure_tts_engine(self.tts_engine)
     
     def setup_microphone(self):
         """Adjust microphone for ambient noise."""
@@ -614,17 +2459,43 @@ class AgenticJarvis:
     
     def speak(self, text):
         """Convert text to speech and display text."""
-        print(f"\n🤖 Jarvis: {text}")
-        print("-" * 60)
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+        with self.speech_lock:
+            print(f"\n🤖 Jarvis: {text}")
+            print("-" * 60)
+            if self.headless:
+                return
+            if self.audio_pool:
+                self.audio_pool.say(text)
+                return
+            self.tts_engine.say(text)
+            self.tts_engine.runAndWait()
+    
+    def announce(self, text):
+        """Queue a notification for the main loop unless a turn is in progress; returns whether it was queued.
+        
+        pyttsx3 engines must be driven from the thread that created them, so
+        the dispatcher never speaks itself.
+        """
+        if not self.idle.is_set():
+            return False
+        self.announcements.put(text)
+        return True
+    
+    def capture_phrase(self, timeout, phrase_time_limit):
+        """Record one phrase from the microphone, or take it from the audio workers."""
+        if self.audio_pool:
+            audio = self.audio_pool.next_utterance(timeout + phrase_time_limit)
+            if audio is None:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            return audio
+        with self.microphone as source:
+            return self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
     
     def listen_for_wake_word(self):
         """Listen specifically for the wake word."""
         try:
-            with self.microphone as source:
-                print("👂 Listening for 'Hey Jarvis'...")
-                audio = self.recognizer.listen(source, timeout=3, phrase_time_limit=5)
+            print("👂 Listening for 'Hey Jarvis'...")
+            audio = self.capture_phrase(timeout=3, phrase_time_limit=5)
             
             text = self.recognizer.recognize_google(audio).lower()
             print(f"🎯 Heard: {text}")
@@ -640,9 +2511,8 @@ class AgenticJarvis:
     def listen(self):
         """Listen for voice input and convert to text."""
         try:
-            with self.microphone as source:
-                print("🎤 I'm listening...")
-                audio = self.recognizer.listen(source, timeout=8, phrase_time_limit=12)
+            print("🎤 I'm listening...")
+            audio = self.capture_phrase(timeout=8, phrase_time_limit=12)
             
             print("🔄 Processing speech...")
             text = self.recognizer.recognize_google(audio).lower()
@@ -663,7 +2533,17 @@ class AgenticJarvis:
         try:
             if self.agent:
                 # Use LangChain agent for intelligent processing
-                response = self.agent.run(input=user_input)
+                TURN_CONTEXT.user_input = user_input
+                TURN_CONTEXT.speech_budget = SpeechBudget.for_input(user_input)
+                try:
+                    response = self.agent.run(input=user_input)
+                finally:
+                    budget = TURN_CONTEXT.speech_budget
+                    TURN_CONTEXT.speech_budget = None
+                print(budget.summary())
+                if budget.truncated:
+                    self.pending_continuation = (user_input, response, budget.intent)
+                    response += " Want more?"
                 return response
             else:
                 # Fallback to basic tool matching
@@ -673,12 +2553,38 @@ class AgenticJarvis:
             print(f"LangChain processing error: {e}")
             return self.basic_tool_processing(user_input)
     
+    def continue_answer(self):
+        """Pick up a reply that was cut short, from where it stopped."""
+        question, answer, intent = self.pending_continuation
+        self.pending_continuation = None
+        prompt = (f"The user asked: {question}\n"
+                  f"You already told them: {answer}\n"
+                  "Continue the answer from exactly where it stopped, without repeating anything already said.")
+        
+        TURN_CONTEXT.speech_budget = SpeechBudget(intent, require_marker=False)
+        try:
+            response = self.llm(prompt)
+        finally:
+            budget = TURN_CONTEXT.speech_budget
+            TURN_CONTEXT.speech_budget = None
+        print(budget.summary())
+        if budget.truncated:
+            self.pending_continuation = (question, answer + " " + response, intent)
+            response += " Want more?"
+        return response
+    
     def basic_tool_processing(self, user_input):
         """Basic tool processing without LangChain agent."""
         user_input = user_input.lower()
         
+        # Calendar lookups
+        if any(phrase in user_input for phrase in ['am i free', 'am i busy', "what's on", 'what is on', 'what do i have', 'agenda', 'my schedule']):
+            params = self.extract_calendar_params(user_input)
+            params['action'] = 'check' if 'time' in params else 'list'
+            return self.tools[0]._run(json.dumps(params))
+        
         # Calendar
-        if any(word in user_input for word in ['schedule', 'meeting', 'appointment', 'calendar']):
+        elif any(word in user_input for word in ['schedule', 'meeting', 'appointment', 'calendar']):
             params = self.extract_calendar_params(user_input)
             return self.tools[0]._run(json.dumps(params))
         
@@ -717,20 +2623,28 @@ class AgenticJarvis:
     
     def extract_calendar_params(self, text):
         """Extract calendar parameters from text."""
-        params = {'title': 'Meeting', 'date': 'today', 'time': '10:00 AM'}
+        params = {'title': 'Meeting', 'date': 'today'}
+        slots = SLOT_PARSER.parse(text)
+        
+        if slots['date']:
+            params['date'] = slots['date'].isoformat()
         
-        if 'tomorrow' in text:
-            params['date'] = 'tomorrow'
+        if slots['time']:
+            params['time'] = slots['time'].strftime('%I:%M %p')
+            if slots['end_time']:
+                params['time'] += ' to ' + slots['end_time'].strftime('%I:%M %p')
         
-        time_match = re.search(r'(\d{1,2}(?::\d{2})?\s*(?:am|pm))', text)
-        if time_match:
-            params['time'] = time_match.group(1)
+        if slots['duration']:
+            params['duration'] = f"{slots['duration']} seconds"
+        
+        if 'anyway' in text:
+            params['force'] = True
         
         return params
     
     def extract_music_params(self, text):
         """Extract music parameters from text."""
-        params = {'song': 'music', 'platform': 'youtube'}
+        params = {'song': 'music'}
         
         song_match = re.search(r'play (.+?)(?:\s+on|\s*$)', text)
         if song_match:
@@ -745,16 +2659,31 @@ class AgenticJarvis:
     
     def extract_location(self, text):
         """Extract location from text."""
-        location_match = re.search(r'(?:in|for|at)\s+([a-zA-Z\s]+)', text)
-        if location_match:
-            return location_match.group(1).strip()
-        return "current location"
+        return SLOT_PARSER.parse(text)['location'] or "current location"
     
     def process_command(self, text):
         """Process user command using LangChain."""
         if not text or text == "timeout":
+            self.pending_continuation = None
             return "continue"
         
+        # Follow-up to "Want more?" on a reply that was cut short
+        if self.pending_continuation:
+            short = len(text.split()) <= 5
+            if short and re.search(r"\b(?:no|nope|nah|nothing|that's all|that is all|thanks|thank you|i'm good|stop)\b", text):
+                self.pending_continuation = None
+                self.speak("Alright! I'll go back to listening for 'Hey Jarvis'.")
+                self.listening_for_wake_word = True
+                return "sleep"
+            if short and re.search(r'\b(?:yes|yeah|yep|sure|more|go on|continue|keep going)\b', text):
+                try:
+                    self.speak(self.continue_answer())
+                except Exception as e:
+                    self.speak(f"I encountered an error: {str(e)}. Please try again.")
+                return "continue"
+            # Neither yes nor no: treat it as a new command
+            self.pending_continuation = None
+        
         # Handle control commands
         if any(word in text for word in ['sleep', 'standby', 'go to sleep']):
             self.speak("Going to sleep mode. Say 'Hey Jarvis  to wake me up.")
@@ -797,6 +2726,7 @@ class AgenticJarvis:
             while True:
                 try:
                     if self.listening_for_wake_word:
+                        self.speak_announcements()
                         # Wait for wake word
                         if self.listen_for_wake_word():
                             self.speak("Yes, how can I help you?")
@@ -814,6 +2744,13 @@ class AgenticJarvis:
                         elif result == "sleep":
                             continue
                         elif result == "continue":
+                            if self.pending_continuation:
+                                # The reply ended with "Want more?" - take the answer as the next command
+                                continue
+                            
+                            # Timers and mail that came in during this turn
+                            self.deliver_announcements()
+                            
                             # Ask if user needs more help
                             self.speak("Is there anything else I can help you with?")
                             
@@ -840,14 +2777,466 @@ class AgenticJarvis:
             print(f"❌ Critical error: {e}")
             self.speak("I'm experiencing technical difficulties. Please restart me.")
 
+class BatchRunner:
+    """Push a JSONL file of transcripts through the agent and tool stack concurrently."""
+    
+    def __init__(self, jarvis, concurrency=4):
+        self.jarvis = jarvis
+        self.concurrency = max(1, concurrency)
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+        # Bound the number of queued items so huge inputs are streamed, not loaded
+        self.slots = threading.BoundedSemaphore(self.concurrency * 2)
+        self.completed = 0
+        self.errors = 0
+    
+    def _agent(self):
+        """Return this worker thread's agent, each with its own memory."""
+        if not hasattr(self.local, 'agent'):
+            self.local.agent = self.jarvis.create_agent(self.jarvis.create_memory()) if self.jarvis.llm else None
+        return self.local.agent
+    
+    def _read_items(self, input_path):
+        """Yield (index, line number, item id, text, parse error) for each input line."""
+        index = 0
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line)
+                    if isinstance(item, str):
+                        item_id, text = None, item
+                    else:
+                        item_id = item.get('id')
+                        text = item.get('input') or item.get('text') or item.get('transcript')
+                    if not text:
+                        raise ValueError("no 'input', 'text' or 'transcript' field")
+                    yield index, line_no, item_id, text, None
+                except (ValueError, AttributeError) as e:
+                    yield index, line_no, None, None, f"Invalid input line: {str(e)}"
+                index += 1
+    
+    def _process(self, index, line_no, item_id, text, error):
+        """Run one transcript and return its result record."""
+        started = time.time()
+        output = None
+        if not error:
+            try:
+                agent = self._agent()
+                if agent:
+                    agent.memory.clear()
+                    TURN_CONTEXT.user_input = text
+                    output = agent.run(input=text)
+                else:
+                    output = self.jarvis.basic_tool_processing(text)
+            except Exception as e:
+                error = str(e)
+        return {
+            'index': index,
+            'line': line_no,
+            'id': item_id,
+            'input': text,
+            'output': output,
+            'error': error,
+            'started_at': datetime.fromtimestamp(started).isoformat(),
+            'latency_ms': round((time.time() - started) * 1000, 1)
+        }
+    
+    def _write(self, out, future):
+        """Append a finished record to the output file as soon as it completes."""
+        self.slots.release()
+        try:
+            record = future.result()
+        except Exception as e:
+            record = {'index': None, 'output': None, 'error': str(e)}
+        with self.write_lock:
+            self.completed += 1
+            record['completion_order'] = self.completed
+            if record.get('error'):
+                self.errors += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    
+    def run(self, input_path, output_path):
+        """Process every line of input_path and stream results to output_path."""
+        get_http_session(pool_size=self.concurrency)
+        print(f"📦 Batch: {input_path} -> {output_path} ({self.concurrency} workers)")
+        start = time.time()
+        
+        with open(output_path, 'w', encoding='utf-8') as out:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for item in self._read_items(input_path):
+                    self.slots.acquire()
+                    future = executor.submit(self._process, *item)
+                    future.add_done_callback(lambda f: self._write(out, f))
+        
+        elapsed = time.time() - start
+        throughput = self.completed / elapsed if elapsed > 0 else 0.0
+        print(f"✅ Batch complete: {self.completed} items ({self.errors} errors) in {elapsed:.1f}s - {throughput:.2f} items/s")
+        return {'items': self.completed, 'errors': self.errors, 'elapsed': elapsed, 'items_per_second': throughput}
+
+# Reference "now" for the corpus: Wednesday 21 October 2026, 09:00 IST
+SLOT_PARSER_CORPUS = [
+    # Relative dates
+    ("schedule a meeting today at 3 pm", {'date': '2026-10-21', 'time': '15:00'}),
+    ("schedule a meeting tomorrow at 3 pm", {'date': '2026-10-22', 'time': '15:00'}),
+    ("book a call for tomorrow", {'date': '2026-10-22', 'time': None}),
+    ("dentist the day after tomorrow at 11 am", {'date': '2026-10-23', 'time': '11:00'}),
+    ("what did i have yesterday", {'date': '2026-10-20'}),
+    ("plan a review next week", {'date': '2026-10-28'}),
+    ("remind me in 3 days", {'date': '2026-10-24', 'duration': None}),
+    ("set up a sync in two weeks", {'date': '2026-11-04'}),
+    ("lunch 5 days from now at noon", {'date': '2026-10-26', 'time': '12:00'}),
+    ("dinner tonight", {'date': '2026-10-21', 'time': '20:00'}),
+    ("dinner tonight at 8", {'date': '2026-10-21', 'time': '20:00'}),
+    ("call mom tomorrow morning", {'date': '2026-10-22', 'time': '09:00'}),
+    ("gym tomorrow evening", {'date': '2026-10-22', 'time': '18:00'}),
+    ("review this afternoon", {'date': None, 'time': '15:00'}),
+    ("pick up the kids tomorrow in the afternoon", {'date': '2026-10-22', 'time': '15:00'}),
+    # Weekdays
+    ("meeting on friday at 2 pm", {'date': '2026-10-23', 'time': '14:00'}),
+    ("meeting next monday at 9 am", {'date': '2026-10-26', 'time': '09:00'}),
+    ("standup this wednesday at 10 am", {'date': '2026-10-21', 'time': '10:00'}),
+    ("standup on wednesday", {'date': '2026-10-28'}),
+    ("haircut saturday at 4", {'date': '2026-10-24', 'time': '16:00'}),
+    ("brunch on sunday at 11", {'date': '2026-10-25', 'time': '11:00'}),
+    ("1:1 on tuesday at 10:30 am", {'date': '2026-10-27', 'time': '10:30'}),
+    ("demo this coming thursday at 5 p.m.", {'date': '2026-10-22', 'time': '17:00'}),
+    ("offsite on tues", {'date': '2026-10-27'}),
+    ("retro thurs at 4:15 pm", {'date': '2026-10-22', 'time': '16:15'}),
+    # Absolute dates
+    ("flight on 2026-12-24 at 6 am", {'date': '2026-12-24', 'time': '06:00'}),
+    ("conference on march 3rd", {'date': '2027-03-03'}),
+    ("birthday party on november 14", {'date': '2026-11-14'}),
+    ("anniversary dinner on dec 5 at 7:30 pm", {'date': '2026-12-05', 'time': '19:30'}),
+    ("trip starting 25th of december", {'date': '2026-12-25'}),
+    ("deadline the 30th", {'date': '2026-10-30'}),
+    ("rent is due the 1st", {'date': '2026-11-01'}),
+    ("tax appointment on april 15, 2027", {'date': '2027-04-15'}),
+    ("kickoff on the 2nd of january", {'date': '2027-01-02'}),
+    ("call on oct 21", {'date': '2026-10-21'}),
+    ("call on oct 20", {'date': '2027-10-20'}),
+    ("event on 2026-02-30", {'date': None}),
+    ("meet on sept 9th at 9 am", {'date': '2027-09-09', 'time': '09:00'}),
+    # Times
+    ("wake me at 6:45 am", {'time': '06:45'}),
+    ("meeting at 15:30", {'time': '15:30'}),
+    ("lunch at noon", {'time': '12:00'}),
+    ("deploy at midnight", {'time': '00:00'}),
+    ("call at 4 o'clock", {'time': '16:00'}),
+    ("call at 9 oclock", {'time': '09:00'}),
+    ("sync at 10 am", {'time': '10:00'}),
+    ("sync at 12 pm", {'time': '12:00'}),
+    ("sync at 12 am", {'time': '00:00'}),
+    ("sync at 7pm", {'time': '19:00'}),
+    ("sync at 7 P.M.", {'time': '19:00'}),
+    ("sync by 5 pm", {'time': '17:00'}),
+    ("sync at 3", {'time': '15:00'}),
+    ("sync at 9", {'time': '09:00'}),
+    ("sync at 18", {'time': '18:00'}),
+    ("sync at 7 in the morning", {'time': '07:00'}),
+    ("sync at 13 pm", {'time': None}),
+    # Time ranges
+    ("block 3 to 4 pm for focus", {'time': '15:00', 'end_time': '16:00'}),
+    ("workshop from 10 am to 12 pm", {'time': '10:00', 'end_time': '12:00'}),
+    ("workshop from 10 to 12 pm", {'time': '10:00', 'end_time': '12:00'}),
+    ("interview between 2 and 3 pm tomorrow", {'date': '2026-10-22', 'time': '14:00', 'end_time': '15:00'}),
+    ("lecture 9:30-11:15 am on monday", {'date': '2026-10-26', 'time': '09:30', 'end_time': '11:15'}),
+    ("party from 8 pm until 11 pm", {'time': '20:00', 'end_time': '23:00'}),
+    ("shift 11 to 1 pm", {'time': '11:00', 'end_time': '13:00'}),
+    # Durations
+    ("set a timer for 5 minutes", {'duration': 300}),
+    ("set a timer for 1 hour 30 minutes", {'duration': 5400}),
+    ("set a timer for 1 hour and 30 minutes", {'duration': 5400}),
+    ("timer 2 hours, 15 minutes and 10 seconds", {'duration': 8110}),
+    ("countdown 90 seconds", {'duration': 90}),
+    ("timer for 45 secs", {'duration': 45}),
+    ("timer for 10 mins", {'duration': 600}),
+    ("timer for 2 hrs", {'duration': 7200}),
+    ("timer 1h 20m", {'duration': 4800}),
+    ("timer 30s", {'duration': 30}),
+    ("set a timer for half an hour", {'duration': 1800}),
+    ("set a timer for an hour and a half", {'duration': 5400}),
+    ("set a timer for a minute and a half", {'duration': 90}),
+    ("set a timer for five minutes", {'duration': 300}),
+    ("set a timer for twenty five minutes", {'duration': 1500}),
+    ("set a timer for forty five minutes", {'duration': 2700}),
+    ("set a timer for 1.5 hours", {'duration': 5400}),
+    ("remind me in 10 minutes", {'duration': 600, 'date': None}),
+    ("set a timer for my pasta", {'duration': None}),
+    ("i am cooking pasta, set a timer for 10 minutes", {'duration': 600}),
+    ("am i free at 3 pm", {'time': '15:00', 'duration': None}),
+    ("schedule a call at 4 pm, i am busy before", {'time': '16:00', 'duration': None}),
+    ("block 2 hours tomorrow at 3 pm", {'date': '2026-10-22', 'time': '15:00', 'duration': 7200}),
+    ("meeting for 30 minutes at 4 pm", {'time': '16:00', 'duration': 1800}),
+    # Places
+    ("what's the weather like in tokyo", {'location': 'tokyo'}),
+    ("weather in new york tomorrow", {'location': 'new york', 'date': '2026-10-22'}),
+    ("what's the forecast in san francisco on friday", {'location': 'san francisco', 'date': '2026-10-23'}),
+    ("temperature in london today", {'location': 'london', 'date': '2026-10-21'}),
+    ("weather in paris?", {'location': 'paris'}),
+    ("is it raining in rio de janeiro", {'location': 'rio de janeiro'}),
+    ("coffee at starbucks at 5 pm", {'location': 'starbucks', 'time': '17:00'}),
+    ("meet at the office at 10 am", {'location': None, 'time': '10:00'}),
+    ("weather in st. louis", {'location': 'st. louis'}),
+    ("lunch in o'hare at noon", {'location': "o'hare", 'time': '12:00'}),
+    ("weather in mumbai in the evening", {'location': 'mumbai', 'time': '18:00'}),
+    ("what's the weather", {'location': None}),
+    ("what's the weather for today", {'location': None, 'date': '2026-10-21'}),
+    ("weather in 5 minutes", {'location': None, 'duration': 300}),
+    ("dinner in town at 8 tonight", {'location': 'town', 'date': '2026-10-21', 'time': '20:00'}),
+    ("how hot is it in delhi right now", {'location': 'delhi'}),
+    ("weather for london", {'location': 'london'}),
+    ("what's the forecast for new york tomorrow", {'location': 'new york', 'date': '2026-10-22'}),
+    ("weather for the weekend", {'location': None}),
+    ("weather for five hours from now", {'location': None, 'duration': 18000}),
+    # Noise
+    ("", {'date': None, 'time': None, 'end_time': None, 'duration': None, 'location': None}),
+    ("play some jazz on spotify", {'date': None, 'time': None, 'duration': None, 'location': None}),
+    ("check my emails", {'date': None, 'time': None, 'duration': None, 'location': None}),
+    ("lemonade stand is sunny", {'date': None, 'location': None}),
+    ("the 1234 pm bus", {'time': None}),
+]
+
+def benchmark_slot_parser(rounds=200):
+    """Check SlotParser against its corpus and report the per-utterance parse cost."""
+    now = pytz.timezone('Asia/Kolkata').localize(datetime(2026, 10, 21, 9, 0))
+    
+    def as_text(value):
+        if hasattr(value, 'hour'):
+            return value.strftime('%H:%M')
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+    
+    failures = 0
+    for utterance, expected in SLOT_PARSER_CORPUS:
+        slots = SLOT_PARSER.parse(utterance, now)
+        got = {key: as_text(slots[key]) for key in expected}
+        if got != expected:
+            failures += 1
+            print(f"❌ {utterance!r}: expected {expected}, got {got}")
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utterance, _ in SLOT_PARSER_CORPUS:
+            SLOT_PARSER.parse(utterance, now)
+    elapsed = time.perf_counter() - start
+    per_utterance = elapsed / (rounds * len(SLOT_PARSER_CORPUS)) * 1e6
+    
+    print(f"✅ SlotParser corpus: {len(SLOT_PARSER_CORPUS) - failures}/{len(SLOT_PARSER_CORPUS)} utterances parsed as expected")
+    print(f"⏱️  SlotParser: {per_utterance:.1f} µs per utterance ({rounds} rounds)")
+    return failures == 0
+
+def benchmark_music_search(track_count=100000, rounds=3):
+    """Time MusicLibrary.search over a synthetic library full of common title words."""
+    rng = random.Random(7)
+    common = ['the', 'love', 'night', 'my', 'you', 'of', 'in', 'me', 'heart', 'time', 'song', 'baby']
+    syllables = ['ka', 'lo', 'mir', 'tan', 'vel', 'dor', 'si', 'ren', 'bo', 'ash', 'qui', 'lum', 'ne', 'tor', 'za', 'fen',
+                 'gra', 'pel', 'sun', 'ivo', 'cal', 'rho', 'dex', 'wyn']
+    invent = lambda: "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+    artists = [f"{invent()} {invent()}" for _ in range(2000)]
+    
+    library = MusicLibrary(music_dirs=[], index_path=os.devnull)
+    for i in range(track_count):
+        words = [rng.choice(common) for _ in range(rng.randint(1, 3))] + [invent()]
+        rng.shuffle(words)
+        path = f"/music/{i}.mp3"
+        library.tracks[path] = {'path': path, 'mtime': 0, 'title': " ".join(words).title(),
+                                'artist': rng.choice(artists).title(), 'album': None, 'duration': None}
+    start = time.perf_counter()
+    library._build_search_index()
+    build_seconds = time.perf_counter() - start
+    
+    # Misheard titles of real tracks, plus short queries made only of common words
+    targets = rng.sample(sorted(library.tracks), 200)
+    queries = []
+    for path in targets:
+        title = library.tracks[path]['title'].lower()
+        position = rng.randrange(len(title))
+        queries.append((title[:position] + rng.choice('aeiou') + title[position + 1:], path))
+    queries += [(query, None) for query in ['love', 'the night', 'my love', 'love song', 'the heart of the night',
+                                            'baby you', 'time of my life', 'in the night']]
+    
+    misheard = sum(1 for _, path in queries if path) * rounds
+    print(f"🎵 Music index: {track_count} tracks indexed in {build_seconds:.1f}s")
+    passed = False
+    # MusicTool asks for the single best match; a longer list is also timed
+    for limit in (1, 5):
+        found = 0
+        timings = []
+        for _ in range(rounds):
+            for query, path in queries:
+                start = time.perf_counter()
+                results = library.search(query, limit=limit)
+                timings.append((time.perf_counter() - start) * 1000)
+                # Trigrams ignore word order, so a reordered title is an equally good match
+                words = sorted(library.tracks[path]['title'].split()) if path else None
+                if path and any(sorted(track['title'].split()) == words for _, track in results):
+                    found += 1
+        
+        timings.sort()
+        print(f"⏱️  MusicLibrary.search(limit={limit}): {sum(timings) / len(timings):.1f} ms mean, "
+              f"{timings[int(len(timings) * 0.95)]:.1f} ms p95, {timings[-1]:.1f} ms max over {len(timings)} queries")
+        print(f"✅ Misheard titles resolved: {found}/{misheard}")
+        if limit > 1:
+            passed = found >= misheard * 0.9
+    return passed
+
+def resident_memory_mb():
+    """Return this process's resident memory in MB, or None if unknown."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+    except ImportError:
+        return None
+
+def benchmark_local_llm(rounds=3):
+    """Report load time, tokens/sec and resident memory for the local LLM backend."""
+    model_path = os.getenv('LOCAL_MODEL_PATH')
+    if Llama is None or not model_path:
+        print("❌ Set LOCAL_MODEL_PATH and install llama-cpp-python to benchmark the local LLM")
+        return False
+    
+    threads = os.getenv('LOCAL_MODEL_THREADS')
+    llm = LocalLlamaLLM(model_path=model_path, n_threads=int(threads) if threads else None)
+    rss_before = resident_memory_mb()
+    start = time.perf_counter()
+    model, lock = llm.load()
+    load_time = time.perf_counter() - start
+    rss_loaded = resident_memory_mb()
+    
+    prompts = [
+        "Explain in two sentences what a calendar is for.",
+        "Give me one tip for staying focused while working.",
+        "What is the capital of Japan? Answer briefly.",
+    ]
+    total_tokens = 0
+    total_time = 0.0
+    for i in range(rounds):
+        prompt = prompts[i % len(prompts)]
+        start = time.perf_counter()
+        with lock:
+            result = model.create_completion(prompt, max_tokens=llm.max_tokens, temperature=llm.temperature)
+        elapsed = time.perf_counter() - start
+        tokens = result.get('usage', {}).get('completion_tokens', 0)
+        total_tokens += tokens
+        total_time += elapsed
+        print(f"   round {i + 1}: {tokens} tokens in {elapsed:.2f}s ({tokens / elapsed:.1f} tok/s)")
+    
+    def mb(value):
+        return f"{value:.0f} MB" if value is not None else "unknown"
+    
+    print(f"⏱️  Local LLM: loaded in {load_time:.2f}s, {total_tokens / total_time:.1f} tokens/sec over {rounds} rounds")
+    print(f"🧠 Resident memory: {mb(rss_before)} before load, {mb(rss_loaded)} after load, {mb(resident_memory_mb())} after generation")
+    return True
+
+def stress_audio_pipeline(seconds=20):
+    """Capture synthetic audio while the main process is saturated and count dropped frames.
+    
+    Halfway through, the VAD worker is killed to exercise the restart path.
+    """
+    pool = AudioWorkerPool(source='synthetic', tts=False)
+    pool.start()
+    payload = {'steps': [{'thought': 'Do I need to use a tool? Yes ' * 10, 'tool': 'calendar_scheduler',
+                          'input': list(range(50))}] * 200}
+    phrases = 0
+    crashed = False
+    start = time.time()
+    print(f"🔥 Saturating the main process for {seconds}s...")
+    while time.time() - start < seconds:
+        # Stand-in for a busy agent turn: JSON round trips and regex parsing under the GIL
+        text = json.dumps(payload)
+        json.loads(text)
+        re.findall(r'"tool": "(\w+)"', text)
+        
+        if not crashed and time.time() - start > seconds / 2:
+            pool.processes['vad'].kill()
+            crashed = True
+        
+        while True:
+            try:
+                begin, end = pool.utterances.get_nowait()
+            except queue.Empty:
+                break
+            if pool.read_frames(begin, end):
+                phrases += 1
+    
+    # Give the restarted VAD worker time to catch up with capture
+    deadline = time.time() + 10
+    while time.time() < deadline and pool.stats['vad_position'].value < pool.ring.written.value:
+        time.sleep(0.1)
+    stats = pool.snapshot()
+    pool.close()
+    
+    dropped = stats['capture_overruns'] + stats['capture_late'] + stats['vad_dropped']
+    print(f"🎙️  Captured {stats['captured']} frames, VAD processed {stats['vad_processed']}, {phrases} phrases read from shared memory")
+    print(f"🔁 Worker restarts: {stats['restarts'] or 'none'}")
+    print(f"{'✅' if dropped == 0 else '❌'} Dropped frames: {dropped} "
+          f"(capture overruns {stats['capture_overruns']}, late {stats['capture_late']}, VAD lapped {stats['vad_dropped']})")
+    return dropped == 0
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Jarvis AI Assistant")
+    parser.add_argument('--batch', metavar='INPUT_JSONL', help="Process a JSONL file of transcripts instead of listening")
+    parser.add_argument('--output', metavar='OUTPUT_JSONL', help="Where to write batch results (default: <input>.out.jsonl)")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('BATCH_CONCURRENCY', '4')),
+                        help="Number of transcripts processed in parallel in batch mode")
+    parser.add_argument('--bench-parser', action='store_true', help="Check the slot parser corpus and time it")
+    parser.add_argument('--bench-music', action='store_true', help="Time music search over a synthetic 100k-track library")
+    parser.add_argument('--bench-llm', action='store_true', help="Measure tokens/sec and memory of the local LLM")
+    parser.add_argument('--stress-audio', type=int, nargs='?', const=20, metavar='SECONDS',
+                        help="Run the audio workers against a synthetic source while the main process is busy")
+    return parser.parse_args(argv)
+
+def run_batch(args, mistral_api_key):
+    """Run Jarvis over a batch input file without a microphone."""
+    if not mistral_api_key and not os.getenv('LOCAL_MODEL_PATH'):
+        print("⚠️  MISTRAL_API_KEY not found - batch will use basic tool matching")
+    
+    output_path = args.output or os.path.splitext(args.batch)[0] + '.out.jsonl'
+    try:
+        jarvis = AgenticJarvis(mistral_api_key=mistral_api_key, headless=True)
+        BatchRunner(jarvis, concurrency=args.concurrency).run(args.batch, output_path)
+        jarvis.shutdown()
+    except KeyboardInterrupt:
+        print("\n👋 Batch interrupted")
+    except Exception as e:
+        print(f"❌ Batch run failed: {e}")
+
 def main():
     """Main function to initialize and run Jarvis."""
+    args = parse_args()
+    if args.bench_parser:
+        sys.exit(0 if benchmark_slot_parser() else 1)
+    if args.bench_music:
+        sys.exit(0 if benchmark_music_search() else 1)
+    if args.bench_llm:
+        sys.exit(0 if benchmark_local_llm() else 1)
+    if args.stress_audio:
+        sys.exit(0 if stress_audio_pipeline(args.stress_audio) else 1)
+    
     print("🔧 Initializing Jarvis AI Assistant...")
     
     # Get API keys from environment or prompt user
     mistral_api_key = os.getenv('MISTRAL_API_KEY')
     
-    if not mistral_api_key:
+    if args.batch:
+        run_batch(args, mistral_api_key)
+        return
+    
+    if not mistral_api_key and not os.getenv('LOCAL_MODEL_PATH'):
         print("\n⚠️  MISTRAL_API_KEY not found in environment variables.")
         print("You can still use basic functionality, but advanced AI features will be limited.")
         use_basic = input("Continue with basic mode? (y/n): ").lower().strip()
@@ -861,6 +3250,7 @@ def main():
         
         # Run the assistant
         jarvis.run()
+        jarvis.shutdown()
         
     except KeyboardInterrupt:
         print("\n👋 Jarvis shutdown initiated")